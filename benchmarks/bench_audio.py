@@ -0,0 +1,53 @@
+import os
+import tempfile
+from harness import benchmark, measure, load_module
+import inputs
+
+SECONDS = 10.0
+
+
+def _write_input(tmp):
+    import soundfile as sf
+
+    signal_array, sr = inputs.audio(SECONDS)
+    path = os.path.join(tmp, 'sweep.wav')
+    sf.write(path, signal_array.T, sr)
+    return path
+
+
+@benchmark('audio.time_stretch')
+def bench_time_stretch():
+    tp1 = load_module('tp-audio/tp1.py', 'tp_audio_tp1')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_input(tmp)
+        t = measure(lambda: tp1.change_audio_speed(path, 1.5, os.path.join(tmp, 'out.wav')), repeats=3)
+    return {'realtime_factor': (SECONDS / t, 'x', True)}
+
+
+@benchmark('audio.trim')
+def bench_trim():
+    tp1 = load_module('tp-audio/tp1.py', 'tp_audio_tp1')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_input(tmp)
+        t = measure(lambda: tp1.remove_silence(path, 20, os.path.join(tmp, 'out.wav')), repeats=5)
+    return {'realtime_factor': (SECONDS / t, 'x', True)}
+
+
+@benchmark('audio.lowpass')
+def bench_lowpass():
+    # the filter alone, on the loaded array (plots are timed by audio.plots)
+    filters = load_module('tp-audio/filters.py', 'tp_audio_filters')
+    signal_array, sr = inputs.audio(SECONDS)
+    t = measure(lambda: filters.apply(signal_array, filters.design('lowpass', 3000.0, sr), zero_phase=True),
+                repeats=5)
+    return {'realtime_factor': (SECONDS / t, 'x', True)}
+
+
+@benchmark('audio.plots')
+def bench_plots():
+    render = load_module('tp-audio/render.py', 'tp_audio_render')
+    signal_array, sr = inputs.audio(SECONDS)
+    with tempfile.TemporaryDirectory() as tmp:
+        # the four PNG written by tp1.py / tp2.py (waveforms and spectrograms)
+        t = measure(lambda: render.save_plots(signal_array, sr, tmp), repeats=3)
+    return {'realtime_factor': (SECONDS / t, 'x', True)}
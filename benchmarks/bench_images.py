@@ -0,0 +1,33 @@
+import os
+import tempfile
+import cv2
+from harness import ROOT, benchmark, measure, load_module, Skip
+import inputs
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+
+@benchmark('tp3.contour_detection')
+def bench_contour_detection():
+    tp3 = load_module('tp3/main.py', 'tp3_main')
+    results = {}
+    for width, height in RESOLUTIONS:
+        img = inputs.scene(width, height)
+        t = measure(lambda: tp3.contourDetection(img, display=False), repeats=10, min_time=0.5)
+        results[f"{height}p_fps"] = (1 / t, 'frames/s', True)
+    return results
+
+
+@benchmark('tp4.colorize')
+def bench_colorize():
+    model_dir = os.environ.get('COLORIZATION_MODEL_DIR', os.path.join(ROOT, 'tp4', 'models'))
+    if not os.path.exists(os.path.join(model_dir, 'colorization_release_v2.caffemodel')):
+        raise Skip(f"colorization model not found in {model_dir}")
+
+    tp4 = load_module('tp4/main.py', 'tp4_main')
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, 'scene.png')
+        cv2.imwrite(image_path, cv2.cvtColor(inputs.scene(1280, 720), cv2.COLOR_BGR2GRAY))
+        output_path = os.path.join(tmp, 'scene_colorized.png')
+        t = measure(lambda: tp4.colorize_with_cnn(image_path, model_dir, output_path), repeats=3)
+    return {'latency_ms': (t * 1000, 'ms', False)}
@@ -0,0 +1,102 @@
+import os
+import glob
+import tempfile
+import numpy as np
+from harness import benchmark, measure, evict
+import inputs
+
+BATCH_SIZES = [1, 32, 256]
+
+
+@benchmark('shapes.load_data')
+def bench_load_data():
+    import main
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = inputs.write_shape_dataset(f"{tmp}/data", per_class=300)
+        n_images = 3 * 300
+        counter = iter(range(1000))
+
+        # every cold run gets a fresh cache directory
+        cold = measure(lambda: main.load_data(data_dir, cache_dir=f"{tmp}/cache{next(counter)}"),
+                       repeats=3)
+        warm = measure(lambda: main.load_data(data_dir, cache_dir=f"{tmp}/cache0"), repeats=5)
+
+    return {
+        'cold_images_per_s': (n_images / cold, 'images/s', True),
+        'cached_images_per_s': (n_images / warm, 'images/s', True),
+    }
+
+
+@benchmark('shapes.cold_load')
+def bench_cold_load():
+    import main
+    import shards
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = inputs.write_shape_dataset(f"{tmp}/data", per_class=1000)
+        n_images = 3 * 1000
+        pngs = glob.glob(f"{data_dir}/*/*.png")
+        shard_dir = f"{tmp}/shards"
+        shards.pack(data_dir, shard_dir)
+        main.load_data(data_dir, cache_dir=f"{tmp}/cache")
+        cache_files = glob.glob(f"{tmp}/cache/*.npy")
+        shard_files = [os.path.join(shard_dir, f) for f in os.listdir(shard_dir)]
+
+        # every run starts with the files evicted from the page cache
+        cache = measure(lambda: main.load_data(data_dir, cache_dir=f"{tmp}/cache"), repeats=3, warmup=0,
+                        setup=lambda: evict(pngs + cache_files))
+        packed = measure(lambda: main.load_data(shard_dir), repeats=3, warmup=0,
+                         setup=lambda: evict(shard_files))
+        counter = iter(range(1000))
+        decode = measure(lambda: main.load_data(data_dir, cache_dir=f"{tmp}/fresh{next(counter)}"),
+                         repeats=3, warmup=0, setup=lambda: evict(pngs))
+
+    return {
+        'png_decode_images_per_s': (n_images / decode, 'images/s', True),
+        'npy_cache_images_per_s': (n_images / cache, 'images/s', True),
+        'shards_images_per_s': (n_images / packed, 'images/s', True),
+    }
+
+
+@benchmark('shapes.train_step')
+def bench_train_step():
+    import main
+
+    rng = np.random.default_rng(0)
+    x = rng.random((32, 64, 64, 1), dtype=np.float32)
+    y = rng.integers(0, 3, size=32)
+    model = main.create_model()
+    step = measure(lambda: model.train_on_batch(x, y), repeats=20, warmup=3)
+    return {
+        'step_ms': (step * 1000, 'ms', False),
+        'samples_per_s': (32 / step, 'samples/s', True),
+    }
+
+
+@benchmark('shapes.inference')
+def bench_inference():
+    import main
+
+    rng = np.random.default_rng(0)
+    model = main.create_model()
+    results = {}
+    for batch_size in BATCH_SIZES:
+        x = rng.random((batch_size, 64, 64, 1), dtype=np.float32)
+        t = measure(lambda: model.predict(x, batch_size=batch_size, verbose=0),
+                    repeats=10, warmup=2, min_time=0.5)
+        results[f"batch{batch_size}_images_per_s"] = (batch_size / t, 'images/s', True)
+    return results
+
+
+@benchmark('shapes.synthetic')
+def bench_synthetic():
+    import synthetic
+
+    generate = measure(lambda: synthetic.generate(1024, 0), repeats=10, warmup=1)
+    ds = iter(synthetic.make_tf_dataset(256, seed=0))
+    stream = measure(lambda: [next(ds) for _ in range(16)], repeats=5, warmup=1)
+    return {
+        'generate_samples_per_s': (1024 / generate, 'samples/s', True),
+        'tf_data_samples_per_s': (16 * 256 / stream, 'samples/s', True),
+    }
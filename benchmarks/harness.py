@@ -0,0 +1,101 @@
+import os
+import io
+import sys
+import time
+import platform
+import contextlib
+import subprocess
+import importlib.util
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark function returning {metric: (value, unit, higher_is_better)}"""
+    def decorator(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return decorator
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose inputs are not available on this machine"""
+
+
+def load_module(relpath, name):
+    """Import a script of the repo by path (tp3/main.py, tp-audio/tp1.py, ...)"""
+    path = os.path.join(ROOT, relpath)
+    module_dir = os.path.dirname(path)
+    if module_dir not in sys.path:
+        # appended so that sibling scripts named main.py never shadow the root one
+        sys.path.append(module_dir)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(fn, repeats=5, warmup=1, min_time=0.0, setup=None):
+    """Median wall time of fn() in seconds, with fn's stdout silenced; setup() runs untimed before each call"""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        while len(times) < repeats or sum(times) < min_time:
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def evict(paths):
+    """Drop the files from the page cache (posix_fadvise DONTNEED) so the next read is cold"""
+    if not hasattr(os, 'posix_fadvise'):
+        raise Skip("posix_fadvise is not available on this platform")
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+
+def compare(results, baseline, threshold):
+    """List of (benchmark, metric, old, new, change) for metrics that regressed by more than threshold"""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, entry in metrics.items():
+            old = baseline.get(name, {}).get(metric)
+            if not old or not isinstance(entry, dict) or not old.get('value'):
+                continue
+            change = (entry['value'] - old['value']) / old['value']
+            if not entry['higher_is_better']:
+                change = -change
+            if change < -threshold:
+                regressions.append((name, metric, old['value'], entry['value'], change))
+    return regressions
@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import cv2
+
+
+def shape_image(rng, shape, size=200):
+    """White image with one filled black circle, square or triangle, like data/"""
+    img = np.full((size, size), 255, dtype=np.uint8)
+    cx, cy = rng.integers(size // 3, 2 * size // 3, size=2)
+    r = int(rng.integers(size // 8, size // 4))
+    if shape == 'circle':
+        cv2.circle(img, (int(cx), int(cy)), r, 0, -1)
+    else:
+        n = 4 if shape == 'square' else 3
+        angle = rng.uniform(0, 2 * np.pi)
+        theta = angle + np.arange(n) * 2 * np.pi / n
+        pts = np.stack([cx + r * np.cos(theta), cy + r * np.sin(theta)], axis=1)
+        cv2.fillPoly(img, [pts.astype(np.int32)], 0)
+    return img
+
+
+def write_shape_dataset(data_dir, per_class=200, seed=0):
+    """Write a data/-like directory of synthetic PNGs"""
+    rng = np.random.default_rng(seed)
+    for shape in ['circle', 'square', 'triangle']:
+        os.makedirs(os.path.join(data_dir, shape), exist_ok=True)
+        for i in range(per_class):
+            cv2.imwrite(os.path.join(data_dir, shape, f"{i}.png"), shape_image(rng, shape))
+    return data_dir
+
+
+def scene(width, height, n_shapes=20, seed=0):
+    """Color scene with random filled shapes on a textured background"""
+    rng = np.random.default_rng(seed)
+    img = rng.integers(180, 256, size=(height, width, 3), dtype=np.uint8)
+    img = cv2.GaussianBlur(img, (7, 7), 0)
+    for _ in range(n_shapes):
+        color = tuple(int(c) for c in rng.integers(0, 160, size=3))
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        r = int(rng.integers(min(width, height) // 40, min(width, height) // 8))
+        if rng.random() < 0.5:
+            cv2.circle(img, (x, y), r, color, -1)
+        else:
+            cv2.rectangle(img, (x - r, y - r), (x + r, y + r), color, -1)
+    return img
+
+
+def audio(seconds=10.0, sr=44100, channels=2, seed=0):
+    """(channels, samples) float32 tone sweep with noise and leading/trailing silence"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    sweep = 0.5 * np.sin(2 * np.pi * (200 + 400 * t / seconds) * t)
+    x = np.stack([sweep * (0.8 + 0.2 * c) for c in range(channels)])
+    x += 0.01 * rng.standard_normal(x.shape)
+    pad = int(0.5 * sr)
+    x[:, :pad] = 0
+    x[:, -pad:] = 0
+    return x.astype(np.float32), sr
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import fnmatch
+import argparse
+import traceback
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from harness import BENCHMARKS, Skip, metadata, compare
+import bench_shapes  # noqa: F401  (registers benchmarks)
+import bench_images  # noqa: F401
+import bench_audio  # noqa: F401
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the repo benchmarks on synthetic inputs")
+    parser.add_argument('patterns', nargs='*', default=['*'],
+                        help="glob patterns of benchmarks to run (e.g. 'shapes.*')")
+    parser.add_argument('--output', default=None, help="write results to this JSON file")
+    parser.add_argument('--baseline', default=None, help="previous results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative slowdown that counts as a regression (default: 0.10)")
+    parser.add_argument('--list', action='store_true', help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if any(fnmatch.fnmatch(n, p) for p in args.patterns)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    results = {}
+    failed = False
+    for name in names:
+        print(f"{name}...", flush=True)
+        try:
+            metrics = BENCHMARKS[name]()
+        except Skip as e:
+            print(f"  skipped: {e}")
+            results[name] = {'skipped': str(e)}
+            continue
+        except Exception:
+            traceback.print_exc()
+            failed = True
+            continue
+        results[name] = {
+            metric: {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+            for metric, (value, unit, higher_is_better) in metrics.items()
+        }
+        for metric, (value, unit, _) in metrics.items():
+            print(f"  {metric:28} {value:12.3f} {unit}")
+
+    report = {'meta': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nresults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for name, metric, old, new, change in regressions:
+                print(f"  {name}.{metric}: {old:.3f} -> {new:.3f} ({change:+.1%})")
+            return 1
+        print(f"\nno regression beyond {args.threshold:.0%} against {args.baseline}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import os
+import io
+import sys
+import time
+import argparse
+import importlib
+import contextlib
+import numpy as np
+import cv2
+import dataset
+
+# Circularity 4*pi*A/P^2 of the convex hull: ~0.97 for circles, ~0.80 for squares,
+# ~0.63 for triangles on data/. Decision boundaries sit halfway between classes.
+CIRCLE_MIN = 0.885
+SQUARE_MIN = 0.715
+MARGIN = 0.085
+MIN_AREA_FRACTION = 0.005
+
+
+def shape_features(gray):
+    """Geometric features of the largest dark shape of a grayscale uint8 image (None if no shape)"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    contour = max(contours, key=cv2.contourArea)
+    area = cv2.contourArea(contour)
+    if area < MIN_AREA_FRACTION * gray.shape[0] * gray.shape[1]:
+        return None
+
+    # the hull smooths the pixel staircase that inflates the perimeter of round shapes
+    hull = cv2.convexHull(contour)
+    perimeter = cv2.arcLength(hull, True)
+    return {
+        'area': area,
+        'circularity': 4 * np.pi * area / perimeter ** 2,
+        'vertices': len(cv2.approxPolyDP(hull, 0.04 * perimeter, True)),
+    }
+
+
+def classify_geometric(gray):
+    """
+    Classify a shape image without a neural network.
+
+    Returns (class index, confidence). The polygon vertex count and the
+    circularity must agree on the class; confidence is the distance of the
+    circularity to the nearest decision boundary, scaled to [0, 1].
+    """
+    features = shape_features(gray)
+    if features is None:
+        return 0, 0.0
+
+    circularity = features['circularity']
+    if circularity >= CIRCLE_MIN:
+        label, distance = 0, circularity - CIRCLE_MIN
+    elif circularity >= SQUARE_MIN:
+        label, distance = 1, min(circularity - SQUARE_MIN, CIRCLE_MIN - circularity)
+    else:
+        label, distance = 2, SQUARE_MIN - circularity
+
+    vertices = features['vertices']
+    vertex_label = 2 if vertices <= 3 else 1 if vertices == 4 else 0
+    if vertex_label != label:
+        return label, 0.0
+    return label, float(min(1.0, distance / MARGIN))
+
+
+def load_fallback(model_path):
+    """Batch predict function of the CNN: TFLite (no TensorFlow import) or Keras .h5"""
+    if model_path.endswith('.tflite'):
+        from predictor import ShapePredictor
+        return ShapePredictor(model_path).predict
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path)
+    # direct call: model.predict sets up a data pipeline on every call (~100 ms per small batch)
+    return lambda images: model(images, training=False).numpy()
+
+
+class Cascade:
+    """Geometric classifier first, CNN only for the images it is not confident about"""
+
+    def __init__(self, model_path, threshold=0.5, batch_size=256):
+        self.model_path = model_path
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.fallback = None
+
+    def classify_paths(self, paths):
+        """Returns (labels, confidences, resolved, readable) where resolved marks images handled
+        without the CNN and readable is False for images neither OpenCV nor PIL could decode
+        (their label is meaningless)"""
+        labels = np.zeros(len(paths), dtype=np.int64)
+        confidences = np.zeros(len(paths), dtype=np.float32)
+        readable = np.ones(len(paths), dtype=bool)
+        for i, path in enumerate(paths):
+            gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if gray is not None:
+                labels[i], confidences[i] = classify_geometric(gray)
+        resolved = confidences >= self.threshold
+
+        pending = np.flatnonzero(~resolved)
+        if len(pending):
+            if self.fallback is None:
+                self.fallback = load_fallback(self.model_path)
+            images = np.empty((len(pending), 64, 64), dtype=np.uint8)
+            valid = dataset.decode_images([paths[i] for i in pending], images, workers=1)
+            readable[pending[~valid]] = False
+            pending = pending[valid]
+            images = dataset.to_float(images[valid]).reshape(-1, 64, 64, 1)
+            for start in range(0, len(images), self.batch_size):
+                probs = self.fallback(images[start:start + self.batch_size])
+                idx = pending[start:start + self.batch_size]
+                labels[idx] = probs.argmax(axis=1)
+                confidences[idx] = probs.max(axis=1)
+        return labels, confidences, resolved, readable
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geometric + CNN cascade shape classifier")
+    parser.add_argument('--model', default='shape_model.h5',
+                        help="fallback CNN (.h5, or .tflite to avoid TensorFlow entirely)")
+    parser.add_argument('--test-dir', default='data/test')
+    parser.add_argument('--results', default='data/test/results.json')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help="geometric confidence needed to skip the CNN")
+    parser.add_argument('--baseline-model', default='shape_model.h5',
+                        help="Keras model timed with test.test_model for the speedup")
+    parser.add_argument('--no-compare', action='store_true', help="do not time test.test_model")
+    args = parser.parse_args(argv)
+
+    correct_labels = dataset.load_test_results(args.results)
+    test_images = [f for f in os.listdir(args.test_dir) if f.endswith('.png')]
+    paths = [os.path.join(args.test_dir, f) for f in test_images]
+
+    # imported before both timers: each one times model loading and inference, not imports
+    with contextlib.redirect_stdout(io.StringIO()):
+        importlib.import_module('predictor' if args.model.endswith('.tflite') else 'tensorflow')
+        if not args.no_compare:
+            import test
+
+    start = time.perf_counter()
+    cascade = Cascade(args.model, args.threshold)
+    labels, confidences, resolved, readable = cascade.classify_paths(paths)
+    cascade_time = time.perf_counter() - start
+
+    correct = 0
+    for img_file, label, confidence, geometric, ok in zip(test_images, labels, confidences, resolved, readable):
+        correct_shape = correct_labels.get(img_file, "unknown")
+        if not ok:
+            # counted as wrong, as in test.py
+            print(f"✗ {img_file}: unreadable image, correct={correct_shape}")
+            continue
+        predicted_shape = dataset.SHAPES[label]
+        is_correct = predicted_shape == correct_shape
+        correct += is_correct
+        status = "✓" if is_correct else "✗"
+        source = "geometry" if geometric else "cnn"
+        print(f"{status} {img_file}: predicted={predicted_shape}, correct={correct_shape}, "
+              f"confidence={confidence:.2f} [{source}]")
+
+    print(f"\n{'='*50}")
+    print(f"Total images: {len(test_images)}")
+    print(f"Accuracy: {correct / len(test_images) * 100:.2f}%")
+    print(f"Resolved without the CNN: {resolved.sum()}/{len(test_images)} ({resolved.mean() * 100:.1f}%)")
+    if not readable.all():
+        print(f"Unreadable images (counted as wrong): {(~readable).sum()}")
+    print(f"Cascade time: {cascade_time:.3f} s")
+
+    if not args.no_compare:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            test.test_model(args.baseline_model, args.test_dir, args.results)
+        baseline_time = time.perf_counter() - start
+        print(f"test.test_model time: {baseline_time:.3f} s (speedup x{baseline_time / cascade_time:.1f})")
+    print(f"{'='*50}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+
+SHAPES = ['circle', 'square', 'triangle']
+IMG_SIZE = 64
+CACHE_VERSION = 1
+
+
+def decode_image(img_path):
+    """Decode one image to a 64x64 grayscale uint8 array (None on failure)"""
+    try:
+        img = Image.open(img_path).convert('L')  # conversion en noir et blanc
+        img = img.resize((IMG_SIZE, IMG_SIZE))  # redimensionne en 64x64
+        return np.asarray(img, dtype=np.uint8)
+    except Exception as e:
+        print(f"error loading {img_path}: {e}")
+        return None
+
+
+def load_test_results(json_path):
+    """Load the correct labels from results.json"""
+    with open(json_path, 'r') as f:
+        results = json.load(f)
+    
+    # Create a dictionary mapping filename to correct label
+    correct_labels = {}
+    for shape, filenames in results.items():
+        for filename in filenames:
+            correct_labels[filename] = shape
+    
+    return correct_labels
+
+
+def list_images(data_dir):
+    """List the training images of data_dir as (paths, labels)"""
+    paths = []
+    labels = []
+    for label_idx, shape in enumerate(SHAPES):
+        shape_dir = os.path.join(data_dir, shape)
+        if not os.path.exists(shape_dir):
+            continue
+        image_files = sorted(f for f in os.listdir(shape_dir) if f.endswith('.png'))
+        paths.extend(os.path.join(shape_dir, f) for f in image_files)
+        labels.extend([label_idx] * len(image_files))
+    return paths, np.array(labels, dtype=np.int64)
+
+
+def fingerprint(paths):
+    """Hash file names, sizes and mtimes so the cache is invalidated on any change"""
+    h = hashlib.sha1(f"v{CACHE_VERSION}:{IMG_SIZE}".encode())
+    for path in paths:
+        st = os.stat(path)
+        h.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()[:16]
+
+
+def decode_images(paths, out, workers=None, chunksize=64):
+    """Decode paths into the preallocated uint8 array out, returns a mask of the valid rows"""
+    valid = np.ones(len(paths), dtype=bool)
+    if workers == 1:
+        decoded = map(decode_image, paths)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        decoded = executor.map(decode_image, paths, chunksize=chunksize)
+    try:
+        for i, img in enumerate(decoded):
+            if img is None:
+                valid[i] = False
+            else:
+                out[i] = img
+    finally:
+        if workers != 1:
+            executor.shutdown()
+    return valid
+
+
+def _remove_stale_caches(cache_dir, key):
+    # delete every .npy whose key ('images-<key>.npy...' -> '<key>') is not the current fingerprint
+    for f in os.listdir(cache_dir):
+        if f.endswith('.npy') and f.split('.')[0].rsplit('-', 1)[-1] != key:
+            os.remove(os.path.join(cache_dir, f))
+
+
+def load_cached(data_dir, cache_dir=None, workers=None):
+    """
+    Load the dataset as a read-only memory-mapped uint8 array of shape (N, 64, 64)
+    and its labels.
+
+    Images are decoded once with a process pool and written to a .npy cache keyed
+    on the directory contents; later calls only map the cache file.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(data_dir, '.cache')
+
+    paths, labels = list_images(data_dir)
+    key = fingerprint(paths)
+    images_path = os.path.join(cache_dir, f"images-{key}.npy")
+    labels_path = os.path.join(cache_dir, f"labels-{key}.npy")
+
+    if os.path.exists(images_path) and os.path.exists(labels_path):
+        return np.load(images_path, mmap_mode='r'), np.load(labels_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    print(f"decoding {len(paths)} images into {images_path}...")
+    # per-process temporary names: several training workers may fill the cache at once
+    tmp_path = f"{images_path}.{os.getpid()}.tmp"
+    images = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                       shape=(len(paths), IMG_SIZE, IMG_SIZE))
+    valid = decode_images(paths, images, workers)
+
+    if not valid.all():
+        # rewrite without the files that failed to decode
+        kept = np.lib.format.open_memmap(tmp_path + '2', mode='w+', dtype=np.uint8,
+                                         shape=(int(valid.sum()), IMG_SIZE, IMG_SIZE))
+        kept[:] = images[valid]
+        kept.flush()
+        del images, kept
+        os.replace(tmp_path + '2', tmp_path)
+        labels = labels[valid]
+    else:
+        images.flush()
+        del images
+
+    np.save(f"{labels_path}.{os.getpid()}.npy", labels)
+    os.replace(f"{labels_path}.{os.getpid()}.npy", labels_path)
+    os.replace(tmp_path, images_path)
+
+    _remove_stale_caches(cache_dir, key)
+    return np.load(images_path, mmap_mode='r'), labels
+
+
+def to_float(images):
+    """Scale uint8 images to float32 in [0, 1] with a single allocation"""
+    return np.divide(images, 255.0, dtype=np.float32)
+
+
+def _decode_batch(path):
+    """decode_image as a batch of 0 (unreadable) or 1 image, for tf.numpy_function"""
+    img = decode_image(path.decode())
+    if img is None:
+        return np.empty((0, IMG_SIZE, IMG_SIZE, 1), dtype=np.uint8)
+    return img.reshape(1, IMG_SIZE, IMG_SIZE, 1)
+
+
+def _tf_decode(path, label):
+    # same PIL decoding and resize as decode_image: streamed, cached and test
+    # images get identical pixels
+    import tensorflow as tf
+    img = tf.numpy_function(_decode_batch, [path], tf.uint8, stateful=False)
+    img.set_shape((None, IMG_SIZE, IMG_SIZE, 1))
+    return img, tf.fill(tf.shape(img)[:1], label)
+
+
+def _tf_scale(img, label):
+    import tensorflow as tf
+    return tf.cast(img, tf.float32) / 255.0, label
+
+
+def make_tf_dataset(paths, labels, batch_size=32, training=False, cache=None,
+                    shuffle_buffer=10000, seed=None, num_shards=1, shard_index=0, repeat=False):
+    """
+    Build a streaming tf.data pipeline over image files.
+
+    Files are decoded and resized in parallel and kept as uint8 until batching,
+    so memory is bounded by the shuffle buffer and prefetch depth rather than by
+    the dataset size. cache can be None (no cache), '' (in memory) or a file
+    prefix for an on-disk cache. With num_shards > 1 only every num_shards-th
+    file starting at shard_index is read, so each training worker decodes its
+    own part of the dataset.
+    """
+    import tensorflow as tf
+
+    ds = tf.data.Dataset.from_tensor_slices((list(paths), np.asarray(labels)))
+    if num_shards > 1:
+        ds = ds.shard(num_shards, shard_index)
+        paths = paths[shard_index::num_shards]
+    if training:
+        # shuffling the file list is cheap and decorrelates the decode order
+        ds = ds.shuffle(len(paths), seed=seed, reshuffle_each_iteration=cache is None)
+    # unreadable files give an empty batch and are skipped, as in load_cached
+    ds = ds.map(_tf_decode, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not training).unbatch()
+    if cache is not None:
+        ds = ds.cache(cache)
+    return _batch(ds, batch_size, training, shuffle_buffer, seed, repeat)
+
+
+def make_array_dataset(images, labels, batch_size=32, training=False, shuffle_buffer=10000,
+                       seed=None, num_shards=1, shard_index=0, repeat=False):
+    """
+    Same pipeline as make_tf_dataset over uint8 images already in memory (e.g. load_cached).
+
+    Only the shard of this worker is copied into the dataset and images stay
+    uint8 until batching.
+    """
+    import tensorflow as tf
+
+    images = np.asarray(images[shard_index::num_shards]).reshape(-1, IMG_SIZE, IMG_SIZE, 1)
+    labels = np.asarray(labels[shard_index::num_shards])
+    ds = tf.data.Dataset.from_tensor_slices((images, labels))
+    return _batch(ds, batch_size, training, shuffle_buffer, seed, repeat)
+
+
+def _batch(ds, batch_size, training, shuffle_buffer, seed, repeat):
+    import tensorflow as tf
+
+    if training:
+        ds = ds.shuffle(shuffle_buffer, seed=seed)
+    if repeat:
+        # distributed training runs a fixed number of steps per epoch on every replica
+        ds = ds.repeat()
+    ds = ds.batch(batch_size, drop_remainder=repeat)
+    ds = ds.map(_tf_scale, num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
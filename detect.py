@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import argparse
+import importlib.util
+import numpy as np
+import cv2
+import dataset
+from cascade import load_fallback
+
+# Fraction of the crop side taken by the shape, as in the training images of data/
+SHAPE_FILL = 0.55
+MIN_SIZE = 12
+MAX_PROPOSALS = 256
+
+
+def _load_tp3():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tp3', 'main.py')
+    spec = importlib.util.spec_from_file_location('tp3_main', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tp3 = _load_tp3()
+
+
+def propose(image, stream=None):
+    """
+    Candidate boxes (x, y, w, h) from the tp3 gray -> blur -> Canny -> contours chain.
+
+    Only outer contours are kept; boxes smaller than MIN_SIZE pixels or covering
+    almost the whole image are dropped, and the largest MAX_PROPOSALS are returned.
+    """
+    if stream is None or stream.size != (image.shape[1], image.shape[0]):
+        stream = tp3.ContourStream(image.shape)
+    _, contours, _ = stream.contours(image, mode=cv2.RETR_EXTERNAL)
+    if not contours:
+        return np.empty((0, 4), dtype=np.int32)
+
+    boxes = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32)
+    h, w = image.shape[:2]
+    keep = ((boxes[:, 2] >= MIN_SIZE) & (boxes[:, 3] >= MIN_SIZE)
+            & ~((boxes[:, 2] >= 0.95 * w) & (boxes[:, 3] >= 0.95 * h)))
+    boxes = boxes[keep]
+    order = np.argsort(-(boxes[:, 2] * boxes[:, 3]))[:MAX_PROPOSALS]
+    return boxes[order]
+
+
+def crop_proposals(gray, boxes):
+    """Square, padded 64x64 uint8 crops centered on each box, padded with white like data/"""
+    crops = np.empty((len(boxes), 64, 64), dtype=np.uint8)
+    h, w = gray.shape
+    for i, (x, y, bw, bh) in enumerate(boxes):
+        side = int(np.ceil(max(bw, bh) / SHAPE_FILL))
+        x0 = x + bw // 2 - side // 2
+        y0 = y + bh // 2 - side // 2
+        crop = np.full((side, side), 255, dtype=np.uint8)
+        sx0, sy0 = max(x0, 0), max(y0, 0)
+        sx1, sy1 = min(x0 + side, w), min(y0 + side, h)
+        crop[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = gray[sy0:sy1, sx0:sx1]
+        cv2.resize(crop, (64, 64), dst=crops[i], interpolation=cv2.INTER_AREA)
+    return crops
+
+
+class Detector:
+    """Contour proposals + one batched CNN call per scene"""
+
+    def __init__(self, model_path, min_score=0.8, nms_threshold=0.3):
+        self.predict = load_fallback(model_path)
+        self.min_score = min_score
+        self.nms_threshold = nms_threshold
+        self.stream = None
+        self.timings = {}
+
+    def detect(self, image):
+        """Returns a list of {'box': (x, y, w, h), 'label': str, 'score': float}"""
+        t0 = time.perf_counter()
+        if self.stream is None or self.stream.size != (image.shape[1], image.shape[0]):
+            self.stream = tp3.ContourStream(image.shape)
+        boxes = propose(image, self.stream)
+        gray = self.stream.gray
+        crops = crop_proposals(gray, boxes)
+        t1 = time.perf_counter()
+
+        detections = []
+        if len(boxes):
+            probs = self.predict(dataset.to_float(crops).reshape(-1, 64, 64, 1))
+            labels = probs.argmax(axis=1)
+            scores = probs.max(axis=1)
+            keep = cv2.dnn.NMSBoxes(boxes.tolist(), scores.astype(float).tolist(),
+                                    self.min_score, self.nms_threshold)
+            for i in np.array(keep, dtype=np.int64).ravel():
+                detections.append({
+                    'box': tuple(int(v) for v in boxes[i]),
+                    'label': dataset.SHAPES[labels[i]],
+                    'score': float(scores[i]),
+                })
+        t2 = time.perf_counter()
+        self.timings = {'proposals_ms': (t1 - t0) * 1000, 'classify_ms': (t2 - t1) * 1000,
+                        'proposals': len(boxes)}
+        return detections
+
+
+def draw(image, detections):
+    colors = {'circle': (0, 0, 255), 'square': (0, 255, 0), 'triangle': (255, 0, 0)}
+    out = image.copy()
+    for d in detections:
+        x, y, w, h = d['box']
+        cv2.rectangle(out, (x, y), (x + w, y + h), colors[d['label']], 2)
+        cv2.putText(out, f"{d['label']} {d['score']:.2f}", (x, max(y - 5, 10)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, colors[d['label']], 1)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detect circles, squares and triangles in full scenes")
+    parser.add_argument('images', nargs='+')
+    parser.add_argument('--model', default='shape_model.h5', help="CNN (.h5 or .tflite)")
+    parser.add_argument('--min-score', type=float, default=0.8)
+    parser.add_argument('--nms', type=float, default=0.3, help="IoU threshold of non-maximum suppression")
+    parser.add_argument('--output-dir', default=None, help="write annotated images here")
+    args = parser.parse_args(argv)
+
+    detector = Detector(args.model, args.min_score, args.nms)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    for path in args.images:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"error loading {path}", file=sys.stderr)
+            continue
+        detections = detector.detect(image)
+        t = detector.timings
+        print(f"{path}: {len(detections)} shapes from {t['proposals']} proposals "
+              f"(proposals {t['proposals_ms']:.1f} ms, classification {t['classify_ms']:.1f} ms)")
+        for d in detections:
+            print(f"  {d['label']:8} {d['score']:.2f} box={d['box']}")
+        if args.output_dir:
+            name = os.path.splitext(os.path.basename(path))[0]
+            cv2.imwrite(os.path.join(args.output_dir, f"{name}_detections.png"), draw(image, detections))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import os
+import argparse
+import numpy as np
+import tensorflow as tf
+import dataset
+
+
+def representative_dataset(data_dir, num_samples=500, seed=42):
+    """Calibration images for int8 post-training quantization, drawn from data_dir"""
+    images, _ = dataset.load_cached(data_dir)
+    rng = np.random.default_rng(seed)
+    indices = rng.choice(len(images), size=min(num_samples, len(images)), replace=False)
+
+    def generator():
+        for i in np.sort(indices):
+            yield [dataset.to_float(images[i]).reshape(1, 64, 64, 1)]
+
+    return generator
+
+
+def export_tflite(model_path, output_path=None, quantize=False, data_dir='data', num_samples=500):
+    """
+    Convert a Keras .h5 shape model to TFLite.
+
+    With quantize=True, weights and activations are quantized to int8 using
+    images from data_dir for calibration; inputs and outputs stay float32 so the
+    predictor is the same for both variants.
+    """
+    if output_path is None:
+        suffix = '_int8.tflite' if quantize else '.tflite'
+        output_path = os.path.splitext(model_path)[0] + suffix
+
+    model = tf.keras.models.load_model(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset(data_dir, num_samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    return output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the shape CNN to TFLite")
+    parser.add_argument('--model', default='shape_model.h5')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--quantize', action='store_true',
+                        help="int8 post-training quantization calibrated on --data-dir")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--calibration-samples', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    output_path = export_tflite(args.model, args.output, args.quantize,
+                                args.data_dir, args.calibration_samples)
+    print(f"model exported to '{output_path}' ({os.path.getsize(output_path) / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,24 @@
 import os
+import sys
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import subprocess
 import numpy as np
 from PIL import Image
 import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras import layers
 from sklearn.model_selection import train_test_split
+import dataset
+import shards
+import synthetic
 
-def create_model():
-    # initialisation du modèle 
+def create_model(jit_compile=False):
+    # initialisation du modèle (utilise la politique de précision globale de Keras)
     model = keras.Sequential([
         layers.Conv2D(32, (3, 3), activation='relu', input_shape=(64, 64, 1)),
         layers.MaxPooling2D((2, 2)),
@@ -16,72 +27,539 @@ def create_model():
         layers.Conv2D(64, (3, 3), activation='relu'),
         layers.Flatten(),
         layers.Dense(64, activation='relu'),
-        layers.Dense(3, activation='softmax') 
+        # sortie en float32 pour un softmax stable en précision mixte
+        layers.Dense(3, activation='softmax', dtype='float32')
     ])
     
     model.compile(optimizer='adam',
                   loss='sparse_categorical_crossentropy',
-                  metrics=['accuracy'])
+                  metrics=['accuracy'],
+                  jit_compile=jit_compile)
     
     return model
 
+def load_images(data_dir, cache_dir=None, workers=None):
+    # répertoire de shards (voir shards.py) : quelques lectures séquentielles, aucun accès par image
+    if shards.is_shard_dir(data_dir):
+        images, labels, _ = shards.load_split(data_dir, 'train')
+        return images, labels
+    # décodage parallèle + cache uint8 memory-mappé (voir dataset.py)
+    return dataset.load_cached(data_dir, cache_dir, workers)
+
 # chargement des données
-def load_data(data_dir):
-    shapes = ['circle', 'square', 'triangle']
-    images = []
-    labels = []
-    
-    for label_idx, shape in enumerate(shapes):
-        shape_dir = os.path.join(data_dir, shape)
-        if not os.path.exists(shape_dir):
-            continue
-        
-        print(f"loading {shape} images...")
-        image_files = [f for f in os.listdir(shape_dir) if f.endswith('.png')]
-        
-        for img_file in image_files:
-            img_path = os.path.join(shape_dir, img_file)
-            try:
-                img = Image.open(img_path).convert('L')  # conversion en noir et blanc
-                img = img.resize((64, 64)) # redimensionne en 64x64
-                img_array = np.array(img) / 255.0  
-                images.append(img_array)
-                labels.append(label_idx)
-            except Exception as e:
-                print(f"error loading {img_path}: {e}")
-                continue
-    
-    return np.array(images), np.array(labels)
+def load_data(data_dir, cache_dir=None, workers=None):
+    images, labels = load_images(data_dir, cache_dir, workers)
+    return dataset.to_float(images), labels
 
 
-def main():
-    data_dir = 'data'
-    
-    print("loading data...")
-    images, labels = load_data(data_dir)
-    
-    images = images.reshape(-1, 64, 64, 1)
-    
-    print(f"loaded {len(images)} images")
-    print(f"image shape: {images.shape}")
-    
-    X_train, X_val, y_train, y_val = train_test_split(
-        images, labels, test_size=0.2, random_state=42
-    )
-    
-    print("\ncreating model...")
-    model = create_model()
+class ThroughputCallback(keras.callbacks.Callback):
+    """Print the training throughput (samples/sec) of every epoch, validation excluded"""
+
+    def __init__(self, num_samples):
+        super().__init__()
+        self.num_samples = num_samples
+        self.samples_per_sec = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = time.perf_counter()
+        self.train_end = None
+
+    def on_test_begin(self, logs=None):
+        # validation runs at the end of the epoch, inside fit
+        if self.train_end is None:
+            self.train_end = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = (self.train_end or time.perf_counter()) - self.start
+        self.samples_per_sec.append(self.num_samples / elapsed)
+        print(f"\nepoch {epoch + 1}: {self.samples_per_sec[-1]:.1f} samples/sec ({elapsed:.2f} s)")
+
+
+class TrainingCheckpoint(keras.callbacks.Callback):
+    """
+    Periodic checkpoints, resume after interruption, early stopping and
+    best-model selection on val_accuracy.
+
+    Every `every` epochs the weights (optimizer state included) and the
+    training state (epoch, best val_accuracy, epochs without improvement) are
+    written atomically to `directory`. restore() reloads them so a restarted
+    job continues at the next epoch, and the early-stopping counter survives
+    the restart. The state also records `config` (see training_config), and a
+    checkpoint written with another configuration is never resumed. The best
+    epoch is kept in best.weights.h5 and loaded back into the model at the
+    end of training; the resume state is then removed so the next run starts
+    from scratch.
+    """
+
+    def __init__(self, directory, patience=0, every=1, chief=True, config=None):
+        super().__init__()
+        self.directory = directory
+        self.patience = patience
+        self.config = config
+        self.every = every
+        self.chief = chief
+        # non-chief workers still save (see worker_path) but into a scratch directory
+        self.write_dir = directory if chief else tempfile.mkdtemp(prefix='worker-')
+        self.best = -np.inf
+        self.best_epoch = None
+        self.wait = 0
+        os.makedirs(self.write_dir, exist_ok=True)
+
+    def _path(self, name, directory=None):
+        return os.path.join(directory or self.write_dir, name)
+
+    def restore(self, model):
+        """Load the last checkpoint into model; returns the epoch to resume from (0 without checkpoint)"""
+        state_path = self._path('state.json', self.directory)
+        if not os.path.exists(state_path):
+            return 0
+        with open(state_path) as f:
+            state = json.load(f)
+        saved = state.get('config')
+        if saved != self.config:
+            changed = sorted(k for k in set(saved or {}) | set(self.config or {})
+                             if (saved or {}).get(k) != (self.config or {}).get(k))
+            raise ValueError(f"the checkpoint in {self.directory} was written with a different "
+                             f"configuration ({', '.join(changed)}); remove it or use another --checkpoint-dir")
+        if not model.optimizer.built:
+            model.optimizer.build(model.trainable_variables)
+        model.load_weights(self._path('last.weights.h5', self.directory))
+        self.best, self.best_epoch, self.wait = state['best'], state['best_epoch'], state['wait']
+        if not self.chief and self.best_epoch is not None:
+            shutil.copy(self._path('best.weights.h5', self.directory), self._path('best.weights.h5'))
+        print(f"resuming from {self.directory} after epoch {state['epoch']} "
+              f"(best val_accuracy {self.best:.4f})")
+        return state['epoch']
+
+    def on_epoch_end(self, epoch, logs=None):
+        current = (logs or {}).get('val_accuracy')
+        if current is not None and current > self.best:
+            self.best, self.best_epoch, self.wait = float(current), epoch + 1, 0
+            self._save_weights('best.weights.h5')
+        else:
+            self.wait += 1
+
+        if (epoch + 1) % self.every == 0:
+            self._save_weights('last.weights.h5')
+            tmp_path = self._path('state.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'epoch': epoch + 1, 'best': self.best, 'best_epoch': self.best_epoch,
+                           'wait': self.wait, 'config': self.config}, f)
+            os.replace(tmp_path, self._path('state.json'))
+
+        if self.patience and self.wait >= self.patience:
+            if self.chief:
+                print(f"\nno val_accuracy improvement for {self.wait} epochs, stopping")
+            self.model.stop_training = True
+
+    def on_train_end(self, logs=None):
+        if self.best_epoch is not None:
+            self.model.load_weights(self._path('best.weights.h5'))
+            if self.chief:
+                print(f"\nbest epoch: {self.best_epoch} (val_accuracy {self.best:.4f})")
+        for name in ('last.weights.h5', 'state.json'):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        if not self.chief:
+            shutil.rmtree(self.write_dir, ignore_errors=True)
+
+    def _save_weights(self, name):
+        # write then rename: an interruption never leaves a truncated checkpoint
+        tmp_path = self._path('tmp-' + name)
+        self.model.save_weights(tmp_path)
+        os.replace(tmp_path, self._path(name))
+
+
+def training_config(args, num_replicas=1):
+    """
+    Settings a checkpoint is only valid for: resuming with another batch size,
+    precision or data would silently mix two different trainings. The number
+    of epochs is not one of them: resuming runs from the saved epoch up to
+    the new --epochs.
+
+    The data is identified by the names, sizes and mtimes of its files
+    (dataset.fingerprint), so adding, removing or editing an image counts.
+    """
+    data_dir = args.data_dir
+    if shards.is_shard_dir(data_dir):
+        files = [os.path.join(data_dir, f) for f in sorted(os.listdir(data_dir))]
+    else:
+        files = dataset.list_images(data_dir)[0]
+    return {
+        'batch_size': args.batch_size,
+        'replicas': num_replicas,
+        'precision': args.precision,
+        'xla': args.xla,
+        'synthetic': args.synthetic,
+        'steps_per_epoch': args.steps_per_epoch if args.synthetic else None,
+        'data_dir': os.path.abspath(data_dir),
+        'data': dataset.fingerprint(files),
+    }
+
+
+def make_strategy(name, replicas=None):
+    """
+    tf.distribute strategy for --strategy.
+
+    'mirrored' replicates the model on the local GPUs; without GPU the CPU is
+    split into `replicas` logical devices so synchronous data-parallel training
+    can be exercised on one machine. 'multiworker' reads the cluster from the
+    TF_CONFIG environment variable (see launch_workers).
+    """
+    if name == 'mirrored':
+        if replicas and not tf.config.list_physical_devices('GPU'):
+            cpu = tf.config.list_physical_devices('CPU')[0]
+            tf.config.set_logical_device_configuration(
+                cpu, [tf.config.LogicalDeviceConfiguration() for _ in range(replicas)])
+            return tf.distribute.MirroredStrategy([d.name for d in tf.config.list_logical_devices('CPU')])
+        return tf.distribute.MirroredStrategy()
+    if name == 'multiworker':
+        return tf.distribute.MultiWorkerMirroredStrategy()
+    return tf.distribute.get_strategy()
+
+
+def is_chief(strategy):
+    """True on the worker that owns the saved model (worker 0 when the cluster has no chief)"""
+    resolver = getattr(strategy, 'cluster_resolver', None)
+    if resolver is None or not resolver.task_type:
+        return True
+    if resolver.task_type == 'chief':
+        return True
+    return (resolver.task_type == 'worker' and resolver.task_id == 0
+            and 'chief' not in resolver.cluster_spec().jobs)
+
+
+def worker_path(strategy, path):
+    """
+    Where this worker writes `path`.
+
+    Every worker has to run the save (it may involve collective ops), but only
+    the chief writes to `path`; the others write to a temporary directory that
+    the caller removes afterwards.
+    """
+    if is_chief(strategy):
+        return path
+    return os.path.join(tempfile.mkdtemp(prefix='worker-'), os.path.basename(path))
+
+
+def launch_workers(num_workers, argv):
+    """Run main.py as a num_workers localhost MultiWorkerMirroredStrategy cluster"""
+    ports = []
+    for _ in range(num_workers):
+        with socket.socket() as s:
+            s.bind(('localhost', 0))
+            ports.append(s.getsockname()[1])
+    cluster = {'worker': [f"localhost:{port}" for port in ports]}
+
+    # drop --launch-workers from the arguments forwarded to the workers
+    forwarded, skip = [], False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == '--launch-workers':
+            skip = True
+        elif not arg.startswith('--launch-workers='):
+            forwarded.append(arg)
+
+    print(f"launching {num_workers} workers on {', '.join(cluster['worker'])}")
+    procs = []
+    for index in range(num_workers):
+        env = dict(os.environ, TF_CONFIG=json.dumps({'cluster': cluster,
+                                                     'task': {'type': 'worker', 'index': index}}))
+        procs.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)] + forwarded + ['--strategy', 'multiworker'], env=env))
+    return max(p.wait() for p in procs)
+
+
+def fit_distributed(model, strategy, args, callbacks, initial_epoch=0):
+    """
+    Synchronous data-parallel training with one input pipeline per worker.
+
+    Each worker only decodes its shard of the training and validation file
+    lists and batches it with the per-replica batch size, so the global batch
+    is batch_size x number of replicas. Training epochs run a fixed number of
+    steps (floor of samples / global batch) over a repeated dataset because the
+    shards do not all have the same length; the remainder of each pass is
+    seen in the next epochs. Validation iterates a finite, non-repeated dataset
+    from its start every epoch, so every validation image is counted exactly
+    once; workers whose shard runs out first receive empty batches.
+
+    The loop calls strategy.run directly instead of model.fit, whose first-batch
+    model build reduces the (x, y) tuple across workers and fails under
+    MultiWorkerMirroredStrategy; Keras callbacks are still driven per batch and
+    per epoch and receive the usual loss/accuracy/val_loss/val_accuracy logs.
+    """
+    # shard directories are already decoded; otherwise only file paths are
+    # listed here and each worker decodes (or streams) its own shard below
+    decoded = shards.is_shard_dir(args.data_dir)
+    if decoded:
+        print("loading data...")
+        inputs, labels = load_images(args.data_dir)
+        print(f"loaded {len(inputs)} images")
+    else:
+        inputs, labels = dataset.list_images(args.data_dir)
+        print(f"{'streaming' if args.stream else 'found'} {len(inputs)} images")
+    x_train, x_val, y_train, y_val = train_test_split(inputs, labels, test_size=0.2, random_state=42)
+
+    global_batch = args.batch_size * strategy.num_replicas_in_sync
+
+    def distribute(x, y, training, cache):
+        def dataset_fn(ctx):
+            shard = dict(num_shards=ctx.num_input_pipelines, shard_index=ctx.input_pipeline_id)
+            kwargs = dict(batch_size=ctx.get_per_replica_batch_size(global_batch), training=training,
+                          shuffle_buffer=args.shuffle_buffer, repeat=training)
+            if args.stream:
+                if cache:
+                    cache_file = f"{cache}.{ctx.input_pipeline_id}"
+                else:
+                    cache_file = cache
+                return dataset.make_tf_dataset(x, y, cache=cache_file, **shard, **kwargs)
+            if decoded:
+                return dataset.make_array_dataset(x, y, **shard, **kwargs)
+            paths = x[ctx.input_pipeline_id::ctx.num_input_pipelines]
+            images = np.empty((len(paths), dataset.IMG_SIZE, dataset.IMG_SIZE), dtype=np.uint8)
+            valid = dataset.decode_images(paths, images)
+            print(f"decoded {int(valid.sum())} images (shard {ctx.input_pipeline_id + 1}/{ctx.num_input_pipelines})")
+            return dataset.make_array_dataset(images[valid], y[ctx.input_pipeline_id::ctx.num_input_pipelines][valid],
+                                              **kwargs)
+        return strategy.distribute_datasets_from_function(dataset_fn)
+
+    val_cache = None if args.cache_file is None else (args.cache_file and args.cache_file + '.val')
+    train_it = iter(distribute(x_train, y_train, True, args.cache_file))
+    val_ds = distribute(x_val, y_val, False, val_cache)
+    steps_per_epoch = max(1, len(x_train) // global_batch)
+
+    with strategy.scope():
+        if not model.optimizer.built:
+            model.optimizer.build(model.trainable_variables)
+        loss_fn = keras.losses.SparseCategoricalCrossentropy(reduction=None)
+        metrics = {name: (keras.metrics.Mean(), keras.metrics.SparseCategoricalAccuracy())
+                   for name in ('train', 'val')}
+
+    def forward(x, y, training):
+        probs = model(x, training=training)
+        return probs, loss_fn(y, probs)
+
+    def gradients(x, y):
+        with tf.GradientTape() as tape:
+            probs, per_sample = forward(x, y, True)
+            loss = tf.nn.compute_average_loss(per_sample, global_batch_size=global_batch)
+            loss = model.optimizer.scale_loss(loss)
+        return probs, per_sample, tape.gradient(loss, model.trainable_variables)
+
+    if args.xla:
+        # the all-reduce of apply_gradients stays outside of the compiled cluster
+        gradients = tf.function(gradients, jit_compile=True)
+
+    def replica_train_step(x, y):
+        probs, per_sample, grads = gradients(x, y)
+        model.optimizer.apply_gradients(zip(grads, model.trainable_variables))
+        metrics['train'][0].update_state(per_sample)
+        metrics['train'][1].update_state(y, probs)
+
+    def replica_test_step(x, y):
+        # a replica whose validation shard is exhausted receives an empty batch,
+        # which the convolutions of the oneDNN CPU kernels do not accept
+        if tf.shape(x)[0] > 0:
+            probs, per_sample = forward(x, y, False)
+            metrics['val'][0].update_state(per_sample)
+            metrics['val'][1].update_state(y, probs)
+
+    @tf.function
+    def train_step(iterator):
+        strategy.run(replica_train_step, args=next(iterator))
+
+    @tf.function
+    def evaluate(dist_dataset):
+        # a new iterator each call: one full pass over the validation set
+        for x, y in dist_dataset:
+            strategy.run(replica_test_step, args=(x, y))
+
+    def results(name, prefix=''):
+        loss, accuracy = metrics[name]
+        return {f"{prefix}loss": float(loss.result()), f"{prefix}accuracy": float(accuracy.result())}
+
+    chief = is_chief(strategy)
+    if chief:
+        callbacks = callbacks + [ThroughputCallback(steps_per_epoch * global_batch)]
+    callbacks = keras.callbacks.CallbackList(
+        callbacks,
+        add_history=True, add_progbar=chief, model=model,
+        verbose=1, epochs=args.epochs, steps=steps_per_epoch)
+
+    print(f"\ntraining model on {strategy.num_replicas_in_sync} replicas "
+          f"(global batch {global_batch}, {steps_per_epoch} steps per epoch)...")
+    model.stop_training = False
+    callbacks.on_train_begin()
+    logs = {}
+    for epoch in range(initial_epoch, args.epochs):
+        for metric in metrics['train'] + metrics['val']:
+            metric.reset_state()
+        callbacks.on_epoch_begin(epoch)
+        for step in range(steps_per_epoch):
+            callbacks.on_train_batch_begin(step)
+            train_step(train_it)
+            callbacks.on_train_batch_end(step, results('train'))
+        logs = results('train')
+
+        callbacks.on_test_begin()
+        evaluate(val_ds)
+        logs.update(results('val', prefix='val_'))
+        callbacks.on_test_end(results('val'))
+
+        callbacks.on_epoch_end(epoch, logs)
+        if model.stop_training:
+            break
+    callbacks.on_train_end(logs)
+    return model.history
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the shape classification CNN")
+    parser.add_argument('--data-dir', default='data',
+                        help="image directory, or shard directory written by shards.py")
+    parser.add_argument('--stream', action='store_true',
+                        help="stream images from disk with tf.data instead of loading them in memory")
+    parser.add_argument('--cache-file', default=None,
+                        help="with --stream, cache decoded images in this file ('' caches in memory)")
+    parser.add_argument('--shuffle-buffer', type=int, default=10000)
+    parser.add_argument('--synthetic', action='store_true',
+                        help="train on shapes rendered on the fly (synthetic.py), validate on --data-dir")
+    parser.add_argument('--steps-per-epoch', type=int, default=200, help="with --synthetic, batches per epoch")
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help="batch size per replica")
+    parser.add_argument('--precision', default='float32',
+                        choices=['float32', 'mixed_float16', 'mixed_bfloat16'],
+                        help="Keras dtype policy used to build the model")
+    parser.add_argument('--xla', action='store_true', help="compile the train step with XLA (jit_compile)")
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help="write checkpoints to this directory and resume from it (disabled by default)")
+    parser.add_argument('--checkpoint-every', type=int, default=1, help="epochs between checkpoints")
+    parser.add_argument('--patience', type=int, default=0,
+                        help="stop after this many epochs without val_accuracy improvement (0 disables)")
+    parser.add_argument('--strategy', default='default', choices=['default', 'mirrored', 'multiworker'],
+                        help="tf.distribute strategy (multiworker reads the cluster from TF_CONFIG)")
+    parser.add_argument('--replicas', type=int, default=None,
+                        help="with --strategy mirrored and no GPU, number of CPU replicas")
+    parser.add_argument('--launch-workers', type=int, default=0,
+                        help="start this many multiworker training processes on localhost")
+    args = parser.parse_args(argv)
+    if args.synthetic and (args.strategy != 'default' or args.launch_workers or args.stream):
+        parser.error("--synthetic cannot be combined with --strategy, --launch-workers or --stream")
+    if args.stream and shards.is_shard_dir(args.data_dir):
+        parser.error("--stream reads image files, shard directories are loaded in memory")
+    return args
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parse_args(argv)
+    if args.launch_workers:
+        return launch_workers(args.launch_workers, argv)
+    data_dir = args.data_dir
+
+    # must run before anything initializes the TensorFlow runtime
+    strategy = make_strategy(args.strategy, args.replicas)
+
+    keras.mixed_precision.set_global_policy(args.precision)
+    print(f"\ncreating model (precision={args.precision}, xla={args.xla})...")
+    with strategy.scope():
+        model = create_model(jit_compile=args.xla)
     model.summary()
+
+    callbacks = []
+    initial_epoch = 0
+    if args.checkpoint_dir:
+        checkpoint = TrainingCheckpoint(args.checkpoint_dir, patience=args.patience,
+                                        every=args.checkpoint_every, chief=is_chief(strategy),
+                                        config=training_config(args, strategy.num_replicas_in_sync))
+        try:
+            with strategy.scope():
+                initial_epoch = checkpoint.restore(model)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        callbacks.append(checkpoint)
+    elif args.patience:
+        callbacks.append(keras.callbacks.EarlyStopping(monitor='val_accuracy', patience=args.patience,
+                                                       restore_best_weights=True))
+
+    if args.strategy != 'default':
+        history = fit_distributed(model, strategy, args, callbacks, initial_epoch)
+    elif args.synthetic:
+        # unbounded training stream: no image is read from disk
+        train_ds = synthetic.make_tf_dataset(args.batch_size, seed=0,
+                                             start=initial_epoch * args.steps_per_epoch)
+        if shards.is_shard_dir(data_dir) or dataset.list_images(data_dir)[0]:
+            print("loading validation data...")
+            X_val, y_val = load_data(data_dir)
+            print(f"validating on the {len(X_val)} images of {data_dir}")
+        else:
+            X_val, y_val = synthetic.generate(2000, rng=1)
+            X_val = dataset.to_float(X_val)
+            print(f"no image in {data_dir}, validating on {len(X_val)} synthetic images")
+
+        print("\ntraining model...")
+        history = model.fit(train_ds,
+                           epochs=args.epochs,
+                           steps_per_epoch=args.steps_per_epoch,
+                           validation_data=(X_val.reshape(-1, 64, 64, 1), y_val),
+                           initial_epoch=initial_epoch,
+                           callbacks=callbacks + [ThroughputCallback(args.steps_per_epoch * args.batch_size)],
+                           verbose=1)
+    elif args.stream:
+        paths, labels = dataset.list_images(data_dir)
+        print(f"streaming {len(paths)} images")
+
+        train_paths, val_paths, y_train, y_val = train_test_split(
+            paths, labels, test_size=0.2, random_state=42
+        )
+        val_cache = None if args.cache_file is None else (args.cache_file and args.cache_file + '.val')
+        train_ds = dataset.make_tf_dataset(train_paths, y_train, batch_size=args.batch_size, training=True,
+                                           cache=args.cache_file, shuffle_buffer=args.shuffle_buffer)
+        val_ds = dataset.make_tf_dataset(val_paths, y_val, batch_size=args.batch_size, cache=val_cache)
+
+        print("\ntraining model...")
+        history = model.fit(train_ds,
+                           epochs=args.epochs,
+                           validation_data=val_ds,
+                           initial_epoch=initial_epoch,
+                           callbacks=callbacks + [ThroughputCallback(len(train_paths))],
+                           verbose=1)
+    else:
+        print("loading data...")
+        images, labels = load_data(data_dir)
+
+        images = images.reshape(-1, 64, 64, 1)
+
+        print(f"loaded {len(images)} images")
+        print(f"image shape: {images.shape}")
+
+        X_train, X_val, y_train, y_val = train_test_split(
+            images, labels, test_size=0.2, random_state=42
+        )
+
+        print("\ntraining model...")
+        history = model.fit(X_train, y_train,
+                           epochs=args.epochs,
+                           batch_size=args.batch_size,
+                           validation_data=(X_val, y_val),
+                           initial_epoch=initial_epoch,
+                           callbacks=callbacks + [ThroughputCallback(len(X_train))],
+                           verbose=1)
     
-    print("\ntraining model...")
-    history = model.fit(X_train, y_train,
-                       epochs=10,
-                       batch_size=32,
-                       validation_data=(X_val, y_val),
-                       verbose=1)
-    
-    model.save('shape_model.h5')
+    save_path = worker_path(strategy, 'shape_model.h5')
+    model.save(save_path)
+    if not is_chief(strategy):
+        shutil.rmtree(os.path.dirname(save_path), ignore_errors=True)
+        return 0
     print("\nmodel saved as 'shape_model.h5'")
+    if args.strategy != 'default':
+        # predict on the distributed model would wait for the other workers, and
+        # would split single images across replicas (empty batches)
+        model = keras.models.load_model(save_path)
     
     test_dir = os.path.join(data_dir, 'test')
     if os.path.exists(test_dir):
@@ -101,6 +579,7 @@ def main():
             confidence = prediction[0][predicted_class]
             
             print(f"{img_file}: {shape_names[predicted_class]} ({confidence:.2f})")
+    return 0
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
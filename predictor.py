@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+import dataset
+
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    from tflite_runtime.interpreter import Interpreter
+
+
+class ShapePredictor:
+    """Run an exported .tflite shape model without importing TensorFlow"""
+
+    def __init__(self, model_path, num_threads=None):
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_size = None
+        # int8 exports (export.py --quantize) keep float32 inputs and outputs but quantized tensors inside
+        self.quantized = any(t['dtype'] == np.int8 for t in self.interpreter.get_tensor_details())
+
+    def predict(self, images):
+        """Class probabilities for a float32 batch of shape (N, 64, 64, 1) scaled to [0, 1]"""
+        images = np.ascontiguousarray(images, dtype=np.float32).reshape(-1, 64, 64, 1)
+        if len(images) != self.batch_size:
+            self.interpreter.resize_tensor_input(self.input_index, images.shape)
+            self.interpreter.allocate_tensors()
+            self.batch_size = len(images)
+        self.interpreter.set_tensor(self.input_index, images)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index).copy()
+
+    def predict_paths(self, paths, workers=None):
+        """Decode image files (in parallel) and return their class probabilities"""
+        images = np.empty((len(paths), 64, 64), dtype=np.uint8)
+        valid = dataset.decode_images(paths, images, workers)
+        if not valid.any():
+            # the interpreter cannot be resized to an empty batch
+            n_classes = self.interpreter.get_output_details()[0]['shape'][-1]
+            return np.empty((0, n_classes), dtype=np.float32), valid
+        return self.predict(dataset.to_float(images[valid])), valid
+
+
+def _load_backend(backend, model_path):
+    if backend == 'keras':
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model_path)
+        return lambda x: model.predict(x, verbose=0)
+    return ShapePredictor(model_path).predict
+
+
+def _bench_child(backend, model_path, test_dir, repeats):
+    """Measured in a fresh interpreter: load, predict the test set and report timings"""
+    import resource
+
+    load_start = time.perf_counter()
+    predict = _load_backend(backend, model_path)
+    test_images = sorted(f for f in os.listdir(test_dir) if f.endswith('.png'))
+    images = np.empty((len(test_images), 64, 64), dtype=np.uint8)
+    dataset.decode_images([os.path.join(test_dir, f) for f in test_images], images, workers=1)
+    images = dataset.to_float(images).reshape(-1, 64, 64, 1)
+    probabilities = predict(images)
+    load_s = time.perf_counter() - load_start
+    print('ready', flush=True)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for i in range(len(images)):
+            predict(images[i:i + 1])
+    single_ms = (time.perf_counter() - start) / (repeats * len(images)) * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(images)
+    batched_ms = (time.perf_counter() - start) / (repeats * len(images)) * 1000
+
+    print(json.dumps({
+        'load_and_first_predict_s': load_s,
+        'latency_batch1_ms': single_ms,
+        'latency_batched_ms': batched_ms,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'files': test_images,
+        'probabilities': np.asarray(probabilities).tolist(),
+    }), flush=True)
+
+
+def benchmark(backend, model_path, test_dir='data/test', repeats=5):
+    """Run _bench_child in a subprocess; cold start is measured from process spawn"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--bench-child', backend, model_path,
+         '--test-dir', test_dir, '--repeats', str(repeats)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    cold_start = None
+    result = None
+    for line in proc.stdout:
+        if line.strip() == 'ready':
+            cold_start = time.perf_counter() - start
+        elif line.startswith('{'):
+            result = json.loads(line)
+    if proc.wait() != 0 or result is None:
+        raise RuntimeError(f"{backend} benchmark failed for {model_path}")
+    result['cold_start_s'] = cold_start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TensorFlow-free shape predictor (TFLite)")
+    parser.add_argument('model', help="exported .tflite model (see export.py)")
+    parser.add_argument('images', nargs='*', help="images to classify")
+    parser.add_argument('--compare', metavar='KERAS_MODEL', default=None,
+                        help="check predictions against the Keras model and compare cold start, RSS and latency")
+    parser.add_argument('--test-dir', default='data/test')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="maximum probability difference (default: 1e-3, or 0.1 for int8 models)")
+    parser.add_argument('--min-agreement', type=float, default=None,
+                        help="minimum argmax agreement in %% (default: 100, or 98 for int8 models)")
+    parser.add_argument('--bench-child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.bench_child:
+        _bench_child(args.bench_child, args.model, args.test_dir, args.repeats)
+        return 0
+
+    if args.images:
+        predictor = ShapePredictor(args.model)
+        probabilities, valid = predictor.predict_paths(args.images)
+        for img_file, probs in zip([p for p, ok in zip(args.images, valid) if ok], probabilities):
+            predicted_class_idx = int(np.argmax(probs))
+            print(f"{img_file}: {dataset.SHAPES[predicted_class_idx]} ({probs[predicted_class_idx]:.2f})")
+
+    if args.compare:
+        keras = benchmark('keras', args.compare, args.test_dir, args.repeats)
+        tflite = benchmark('tflite', args.model, args.test_dir, args.repeats)
+
+        keras_probs = np.array(keras['probabilities'])
+        tflite_probs = np.array(tflite['probabilities'])
+        max_diff = float(np.abs(keras_probs - tflite_probs).max())
+        agreement = float((keras_probs.argmax(1) == tflite_probs.argmax(1)).mean()) * 100
+
+        print(f"\n{'':24}{'keras':>12}{'tflite':>12}")
+        for key, label in [('cold_start_s', 'cold start (s)'),
+                           ('max_rss_mb', 'peak RSS (MB)'),
+                           ('latency_batch1_ms', 'ms/image (batch 1)'),
+                           ('latency_batched_ms', 'ms/image (batched)')]:
+            print(f"{label:24}{keras[key]:>12.3f}{tflite[key]:>12.3f}")
+        # quantization error is expected from an int8 model, so its default bounds are looser
+        quantized = ShapePredictor(args.model).quantized
+        tolerance = args.tolerance if args.tolerance is not None else (0.1 if quantized else 1e-3)
+        min_agreement = args.min_agreement if args.min_agreement is not None else (98.0 if quantized else 100.0)
+
+        print(f"\nmax |p_keras - p_tflite| = {max_diff:.2e}, argmax agreement = {agreement:.2f}%"
+              f" ({'int8' if quantized else 'float32'} model: tolerance {tolerance:g}, agreement >= {min_agreement:g}%)")
+        if max_diff > tolerance or agreement < min_agreement:
+            print("Error: TFLite predictions differ from the Keras model", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import io
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+import dataset
+
+
+class LatencyStats:
+    """Thread-safe request counters with p50/p99 over a sliding window"""
+
+    def __init__(self, window=10000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+
+    def record_batch(self, size):
+        with self.lock:
+            self.batches += 1
+            self.batch_sizes.append(size)
+
+    def record(self, latency, ok=True):
+        with self.lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self.latencies.append(latency)
+
+    def snapshot(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000.0
+            batch_sizes = np.array(self.batch_sizes)
+            uptime = time.perf_counter() - self.started
+            requests, errors, batches = self.requests, self.errors, self.batches
+        return {
+            'uptime_s': uptime,
+            'requests': requests,
+            'errors': errors,
+            'batches': batches,
+            'throughput_rps': requests / uptime if uptime > 0 else 0.0,
+            'mean_batch_size': float(batch_sizes.mean()) if len(batch_sizes) else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-image requests into micro-batches.
+
+    A batch is run as soon as max_batch images are queued or max_latency_ms
+    has elapsed since the first image of the batch arrived.
+    """
+
+    def __init__(self, predict_fn, max_batch=64, max_latency_ms=5.0, stats=None):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self.stats = stats
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, image):
+        """Queue one uint8 64x64 image, returns a Future of its probabilities"""
+        future = Future()
+        self.queue.put((image, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + self.max_latency
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            images = dataset.to_float(np.stack([img for img, _ in batch])).reshape(-1, 64, 64, 1)
+            try:
+                probabilities = self.predict_fn(images)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            if self.stats is not None:
+                self.stats.record_batch(len(batch))
+            for (_, future), probs in zip(batch, probabilities):
+                future.set_result(probs)
+
+
+def load_predict_fn(model_path):
+    """Load the Keras model once and return a batch predict function traced for any batch size"""
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(model_path)
+
+    @tf.function(input_signature=[tf.TensorSpec([None, 64, 64, 1], tf.float32)])
+    def forward(x):
+        return model(x, training=False)
+
+    forward(tf.zeros([1, 64, 64, 1]))  # warm-up / tracing
+    return lambda images: forward(images).numpy()
+
+
+def make_handler(batcher, stats, timeout=30.0):
+    class ShapeRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _reject(self, status, message, start):
+            # the body was not read, so the connection cannot be reused for another request
+            self.close_connection = True
+            stats.record(time.perf_counter() - start, ok=False)
+            self._send_json(status, {'error': message})
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send_json(200, stats.snapshot())
+            elif self.path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            else:
+                self._send_json(404, {'error': f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': f"unknown path {self.path}"})
+                return
+
+            start = time.perf_counter()
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self._reject(411, "Content-Length header required", start)
+                return
+            try:
+                length = int(length)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._reject(400, "invalid Content-Length header", start)
+                return
+            body = self.rfile.read(length)
+            image = dataset.decode_image(io.BytesIO(body))
+            if image is None:
+                stats.record(time.perf_counter() - start, ok=False)
+                self._send_json(400, {'error': "could not decode image"})
+                return
+
+            try:
+                probs = batcher.submit(image).result(timeout=timeout)
+            except Exception as e:
+                stats.record(time.perf_counter() - start, ok=False)
+                self._send_json(500, {'error': str(e)})
+                return
+
+            predicted_class_idx = int(np.argmax(probs))
+            stats.record(time.perf_counter() - start)
+            self._send_json(200, {
+                'shape': dataset.SHAPES[predicted_class_idx],
+                'confidence': float(probs[predicted_class_idx]),
+                'probabilities': dict(zip(dataset.SHAPES, map(float, probs))),
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return ShapeRequestHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shape classification HTTP server with dynamic batching")
+    parser.add_argument('--model', default='shape_model.h5')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-latency-ms', type=float, default=5.0,
+                        help="maximum time a request waits for its batch to fill")
+    args = parser.parse_args(argv)
+
+    print(f"Loading model from {args.model}...")
+    predict_fn = load_predict_fn(args.model)
+    stats = LatencyStats()
+    batcher = MicroBatcher(predict_fn, args.max_batch, args.max_latency_ms, stats)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(batcher, stats))
+    server.daemon_threads = True
+    print(f"Serving on http://{args.host}:{args.port} (POST /predict, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
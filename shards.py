@@ -0,0 +1,160 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import dataset
+
+INDEX = 'index.json'
+SHARD_SIZE = 4096
+FORMAT_VERSION = 1
+# files written by pack(), including temporaries left by an interrupted run
+SHARD_FILE = re.compile(r'^(train|test)-(\d{5}|labels)\.npy(\.tmp(\.npy)?)?$')
+
+
+def is_shard_dir(path):
+    return os.path.exists(os.path.join(path, INDEX))
+
+
+def read_index(shard_dir):
+    with open(os.path.join(shard_dir, INDEX)) as f:
+        return json.load(f)
+
+
+def splits(shard_dir):
+    """Names of the splits packed in shard_dir ('train', and 'test' when data_dir/test existed)"""
+    return list(read_index(shard_dir)['splits'])
+
+
+def _write_split(name, paths, labels, output_dir, shard_size, workers):
+    """Decode paths into .npy uint8 shards of output_dir, returns the index entry of the split"""
+    shards = []
+    kept_paths = []
+    kept_labels = []
+    for start in range(0, len(paths), shard_size):
+        chunk = paths[start:start + shard_size]
+        file_name = f"{name}-{len(shards):05d}.npy"
+        tmp_path = os.path.join(output_dir, file_name + '.tmp')
+        images = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                           shape=(len(chunk), dataset.IMG_SIZE, dataset.IMG_SIZE))
+        valid = dataset.decode_images(chunk, images, workers)
+        if not valid.all():
+            kept = images[valid]
+            del images
+            np.save(tmp_path, kept)
+            os.replace(tmp_path + '.npy', tmp_path)
+        else:
+            images.flush()
+            del images
+        os.replace(tmp_path, os.path.join(output_dir, file_name))
+        shards.append({'file': file_name, 'count': int(valid.sum())})
+        kept_paths.extend(p for p, ok in zip(chunk, valid) if ok)
+        kept_labels.append(labels[start:start + shard_size][valid])
+
+    labels_file = f"{name}-labels.npy"
+    np.save(os.path.join(output_dir, labels_file),
+            np.concatenate(kept_labels) if kept_labels else np.empty(0, dtype=np.int64))
+    return {
+        'shards': shards,
+        'labels': labels_file,
+        'filenames': [os.path.basename(p) for p in kept_paths],
+    }
+
+
+def pack(data_dir, output_dir, shard_size=SHARD_SIZE, workers=None):
+    """
+    Pack the images of data_dir into a few large uint8 shard files.
+
+    The training split comes from the circle/square/triangle directories and
+    the test split from data_dir/test, labelled by its results.json (-1 for
+    files it does not list). Each shard is an .npy array (N, 64, 64) read with
+    one sequential read or memory-mapped; index.json lists the shards, labels
+    and file names and is written last, so a partial conversion is never read.
+
+    Packing over an existing shard directory first removes its index.json, so
+    the old index never describes shards that are being overwritten, and
+    removes the shard files the new index does not list (e.g. a test split
+    that no longer exists, or extra shards of a larger dataset).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if is_shard_dir(output_dir):
+        os.remove(os.path.join(output_dir, INDEX))
+    index = {'version': FORMAT_VERSION, 'img_size': dataset.IMG_SIZE, 'shapes': dataset.SHAPES,
+             'splits': {}}
+
+    paths, labels = dataset.list_images(data_dir)
+    index['splits']['train'] = _write_split('train', paths, labels, output_dir, shard_size, workers)
+
+    test_dir = os.path.join(data_dir, 'test')
+    results_path = os.path.join(test_dir, 'results.json')
+    if os.path.isdir(test_dir):
+        correct = dataset.load_test_results(results_path) if os.path.exists(results_path) else {}
+        test_files = sorted(f for f in os.listdir(test_dir) if f.endswith('.png'))
+        test_labels = np.array([dataset.SHAPES.index(correct[f]) if f in correct else -1
+                                for f in test_files], dtype=np.int64)
+        index['splits']['test'] = _write_split('test', [os.path.join(test_dir, f) for f in test_files],
+                                               test_labels, output_dir, shard_size, workers)
+
+    tmp_path = os.path.join(output_dir, INDEX + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(output_dir, INDEX))
+
+    kept = {entry['labels'] for entry in index['splits'].values()}
+    kept.update(shard['file'] for entry in index['splits'].values() for shard in entry['shards'])
+    for f in os.listdir(output_dir):
+        if SHARD_FILE.match(f) and f not in kept:
+            os.remove(os.path.join(output_dir, f))
+    return index
+
+
+def load_split(shard_dir, split='train', mmap=False):
+    """
+    (images uint8 (N, 64, 64), labels int64, filenames) of one split of a shard directory.
+
+    By default every shard is read with one sequential read into a single array;
+    with mmap=True and a single shard the file is memory-mapped instead.
+    """
+    index = read_index(shard_dir)
+    if index['version'] != FORMAT_VERSION or index['img_size'] != dataset.IMG_SIZE:
+        raise ValueError(f"{shard_dir}: unsupported shard format, pack the dataset again")
+    if split not in index['splits']:
+        raise ValueError(f"{shard_dir}: no '{split}' split (packed splits: {', '.join(index['splits'])})")
+    entry = index['splits'][split]
+    labels = np.load(os.path.join(shard_dir, entry['labels']))
+
+    shards = entry['shards']
+    if mmap and len(shards) == 1:
+        return np.load(os.path.join(shard_dir, shards[0]['file']), mmap_mode='r'), labels, entry['filenames']
+
+    images = np.empty((sum(s['count'] for s in shards), dataset.IMG_SIZE, dataset.IMG_SIZE), dtype=np.uint8)
+    start = 0
+    for shard in shards:
+        # copying from the mapping reads the file sequentially, with kernel readahead
+        shard_images = np.load(os.path.join(shard_dir, shard['file']), mmap_mode='r')
+        images[start:start + len(shard_images)] = shard_images
+        start += len(shard_images)
+        del shard_images
+    return images, labels, entry['filenames']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack the shape dataset into large uint8 shards")
+    parser.add_argument('data_dir', nargs='?', default='data')
+    parser.add_argument('output_dir', nargs='?', default='data/shards')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help="images per shard")
+    parser.add_argument('--workers', type=int, default=None, help="decoding processes")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = pack(args.data_dir, args.output_dir, args.shard_size, args.workers)
+    for name, entry in index['splits'].items():
+        print(f"{name}: {len(entry['filenames'])} images in {len(entry['shards'])} shard(s)")
+    print(f"written to {args.output_dir} in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
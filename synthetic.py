@@ -0,0 +1,164 @@
+import sys
+import time
+import argparse
+import numpy as np
+import cv2
+import dataset
+
+# Fraction of the image side taken by the shape, around the SHAPE_FILL of data/
+SIZE = (0.4, 0.7)
+JITTER = 0.12
+NOISE = (0.0, 12.0)
+STROKE_PROB = 0.2
+STROKE = (1.5, 4.0)
+CHUNK = 256
+
+# Unit gaussian noise images drawn once: sampling them is much cheaper than
+# generating fresh noise for every image, which dominated the render time
+NOISE_BANK = 1024
+_bank = None
+
+# OpenCV drawing functions take fixed-point coordinates with SHIFT fractional bits
+SHIFT = 4
+
+
+def _noise_bank():
+    global _bank
+    if _bank is None:
+        _bank = np.random.default_rng(0).standard_normal(
+            (NOISE_BANK, dataset.IMG_SIZE, dataset.IMG_SIZE), dtype=np.float32)
+    return _bank
+
+
+def render(labels, rng, size=SIZE, jitter=JITTER, noise=NOISE, stroke_prob=STROKE_PROB,
+           stroke=STROKE, out=None):
+    """
+    Render one random shape per label into 64x64 uint8 images (dark shape on white).
+
+    Size, position, rotation, outline vs filled and gaussian noise are drawn per
+    image. Parameters and polygon vertices are computed for the whole batch at
+    once; shapes are then rasterized by OpenCV with antialiasing and sub-pixel
+    precision, and the noise is added to the batch in one pass.
+    """
+    n = len(labels)
+    if out is None:
+        out = np.empty((n, dataset.IMG_SIZE, dataset.IMG_SIZE), dtype=np.uint8)
+    side = dataset.IMG_SIZE
+    scale = 1 << SHIFT
+
+    # extent is the diameter, the side of the square and the side of the triangle
+    extent = rng.uniform(*size, size=n) * side
+    center = side / 2 + rng.uniform(-jitter, jitter, size=(n, 2)) * side
+    angle = rng.uniform(0, 2 * np.pi, size=n)
+    thickness = np.where(rng.random(n) < stroke_prob,
+                         np.rint(rng.uniform(*stroke, size=n)), -1).astype(np.int64)
+
+    sides = np.where(labels == 2, 3, 4)
+    radius = extent / np.where(labels == 2, np.sqrt(3), np.sqrt(2))
+    k = np.arange(4)
+    vertex_angle = angle[:, None] + 2 * np.pi * k / sides[:, None]
+    vertices = center[:, None, :] + radius[:, None, None] * np.stack(
+        [np.cos(vertex_angle), np.sin(vertex_angle)], axis=-1)
+    vertices = np.rint(vertices * scale).astype(np.int32)
+    circle_center = np.rint(center * scale).astype(np.int64)
+    circle_radius = np.rint(extent / 2 * scale).astype(np.int64)
+
+    out.fill(255)
+    for i in range(n):
+        if labels[i] == 0:
+            cv2.circle(out[i], tuple(circle_center[i]), int(circle_radius[i]), 0,
+                       int(thickness[i]), cv2.LINE_AA, SHIFT)
+        elif thickness[i] < 0:
+            cv2.fillPoly(out[i], [vertices[i, :sides[i]]], 0, cv2.LINE_AA, SHIFT)
+        else:
+            cv2.polylines(out[i], [vertices[i, :sides[i]]], True, 0,
+                          int(thickness[i]), cv2.LINE_AA, SHIFT)
+
+    if noise[1] > 0:
+        sigma = rng.uniform(*noise, size=(n, 1, 1)).astype(np.float32)
+        buf = _noise_bank()[rng.integers(NOISE_BANK, size=n)]
+        buf *= sigma
+        buf += out
+        np.clip(buf, 0, 255, out=buf)
+        np.rint(buf, out=out, casting='unsafe')
+    return out
+
+
+def generate(batch_size, rng=None, **kwargs):
+    """
+    Random balanced batch: (images uint8 (batch_size, 64, 64), labels int64).
+
+    Every class appears batch_size // n_classes times (plus at most one for the
+    remainder, drawn at random), in shuffled order.
+    """
+    rng = np.random.default_rng(rng)
+    n_classes = len(dataset.SHAPES)
+    labels = np.concatenate([np.tile(np.arange(n_classes), batch_size // n_classes),
+                             rng.choice(n_classes, batch_size % n_classes, replace=False)])
+    rng.shuffle(labels)
+    images = np.empty((batch_size, dataset.IMG_SIZE, dataset.IMG_SIZE), dtype=np.uint8)
+    # chunks keep the float32 working set in cache
+    for start in range(0, batch_size, CHUNK):
+        render(labels[start:start + CHUNK], rng, out=images[start:start + CHUNK], **kwargs)
+    return images, labels
+
+
+def batches(batch_size, seed=None, **kwargs):
+    """Endless generator of float32 (batch_size, 64, 64, 1) training batches for model.fit"""
+    rng = np.random.default_rng(seed)
+    while True:
+        images, labels = generate(batch_size, rng, **kwargs)
+        yield dataset.to_float(images).reshape(-1, dataset.IMG_SIZE, dataset.IMG_SIZE, 1), labels
+
+
+def make_tf_dataset(batch_size=32, seed=0, start=0, **kwargs):
+    """
+    Endless tf.data source of synthetic batches.
+
+    Batch i is rendered from the seed sequence (seed, i), so the stream is
+    reproducible while batches are generated in parallel by the tf.data map;
+    start skips the first batches, e.g. when resuming training.
+    """
+    import tensorflow as tf
+
+    def render_batch(i):
+        images, labels = generate(batch_size, np.random.default_rng([seed, int(i)]), **kwargs)
+        return images, labels
+
+    def py_render(i):
+        images, labels = tf.numpy_function(render_batch, [i], (tf.uint8, tf.int64))
+        images = tf.reshape(images, (batch_size, dataset.IMG_SIZE, dataset.IMG_SIZE, 1))
+        labels = tf.reshape(labels, (batch_size,))
+        return tf.cast(images, tf.float32) / 255.0, labels
+
+    ds = tf.data.Dataset.range(start, sys.maxsize)
+    ds = ds.map(py_render, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render synthetic shape images")
+    parser.add_argument('--count', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="save the images side by side in this PNG")
+    parser.add_argument('--benchmark', action='store_true', help="measure samples/s on one core")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        generate(1024, args.seed)
+        start = time.perf_counter()
+        total = 0
+        while time.perf_counter() - start < 2.0:
+            total += len(generate(1024, args.seed)[0])
+        print(f"{total / (time.perf_counter() - start):.0f} samples/s")
+
+    if args.output:
+        from PIL import Image
+        images, labels = generate(args.count, args.seed)
+        Image.fromarray(np.hstack(images)).save(args.output)
+        print(f"{args.output}: {', '.join(dataset.SHAPES[i] for i in labels)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
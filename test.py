@@ -1,57 +1,65 @@
 import os
-import json
+import sys
 import numpy as np
-from PIL import Image
 import tensorflow as tf
+import dataset
+import shards
+from dataset import load_test_results
 
-def load_test_results(json_path):
-    """Load the correct labels from results.json"""
-    with open(json_path, 'r') as f:
-        results = json.load(f)
-    
-    # Create a dictionary mapping filename to correct label
-    correct_labels = {}
-    for shape, filenames in results.items():
-        for filename in filenames:
-            correct_labels[filename] = shape
-    
-    return correct_labels
-
-def test_model(model_path, test_dir, results_json_path):
+def test_model(model_path, test_dir, results_json_path, batch_size=256, workers=None):
     """Test the model on all test images and compare with correct labels"""
     
     # Load the saved model
     print(f"Loading model from {model_path}...")
     model = tf.keras.models.load_model(model_path)
     
-    # Load correct labels
-    print(f"Loading correct labels from {results_json_path}...")
-    correct_labels = load_test_results(results_json_path)
-    
-    # Get all test images
-    test_images = [f for f in os.listdir(test_dir) if f.endswith('.png')]
     shape_names = ['circle', 'square', 'triangle']
     
-    print(f"\nTesting {len(test_images)} images...\n")
+    # images that cannot be decoded count as wrong predictions
+    unreadable = []
+    
+    if shards.is_shard_dir(test_dir):
+        # Packed test split: images, labels and file names come from the shards
+        print(f"Loading test shards from {test_dir}...")
+        images, labels, test_images = shards.load_split(test_dir, 'test')
+        correct_labels = {f: shape_names[label] for f, label in zip(test_images, labels) if label >= 0}
+        print(f"\nTesting {len(test_images)} images...\n")
+    else:
+        # Load correct labels
+        print(f"Loading correct labels from {results_json_path}...")
+        correct_labels = load_test_results(results_json_path)
+        
+        # Get all test images
+        test_images = [f for f in os.listdir(test_dir) if f.endswith('.png')]
+        
+        print(f"\nTesting {len(test_images)} images...\n")
+        
+        # Decode all images in parallel into a single tensor
+        images = np.empty((len(test_images), 64, 64), dtype=np.uint8)
+        valid = dataset.decode_images([os.path.join(test_dir, f) for f in test_images], images, workers)
+        unreadable = [f for f, ok in zip(test_images, valid) if not ok]
+        test_images = [f for f, ok in zip(test_images, valid) if ok]
+        images = images[valid]
+    if not test_images and not unreadable:
+        print(f"Error: no test image in '{test_dir}'")
+        return [], 0.0
+    images = dataset.to_float(images).reshape(-1, 64, 64, 1)
+    
+    # Make predictions in one batched forward pass (none if every image is unreadable)
+    if len(images):
+        predictions = model.predict(images, batch_size=batch_size, verbose=0)
+    else:
+        print(f"Error: none of the {len(unreadable)} test images could be read")
+        predictions = np.empty((0, len(shape_names)), dtype=np.float32)
     
     correct_predictions = 0
     total_predictions = 0
     results = []
     
-    for img_file in test_images:
-        img_path = os.path.join(test_dir, img_file)
-        
-        # Load and prepare image
-        img = Image.open(img_path).convert('L')
-        img = img.resize((64, 64))
-        img_array = np.array(img) / 255.0
-        img_array = img_array.reshape(1, 64, 64, 1)
-        
-        # Make prediction
-        prediction = model.predict(img_array, verbose=0)
-        predicted_class_idx = np.argmax(prediction[0])
+    for img_file, prediction in zip(test_images, predictions):
+        predicted_class_idx = np.argmax(prediction)
         predicted_shape = shape_names[predicted_class_idx]
-        confidence = prediction[0][predicted_class_idx]
+        confidence = prediction[predicted_class_idx]
         
         # Get correct label
         correct_shape = correct_labels.get(img_file, "unknown")
@@ -75,13 +83,28 @@ def test_model(model_path, test_dir, results_json_path):
         status = "✓" if is_correct else "✗"
         print(f"{status} {img_file}: predicted={predicted_shape}, correct={correct_shape}, confidence={confidence:.2f}")
     
+    for img_file in unreadable:
+        correct_shape = correct_labels.get(img_file, "unknown")
+        total_predictions += 1
+        results.append({
+            'filename': img_file,
+            'predicted': None,
+            'correct': correct_shape,
+            'confidence': 0.0,
+            'correct': False,
+            'error': 'unreadable image'
+        })
+        print(f"✗ {img_file}: unreadable image, correct={correct_shape}")
+    
     # Calculate and print accuracy
-    accuracy = (correct_predictions / total_predictions) * 100
+    accuracy = (correct_predictions / total_predictions) * 100 if total_predictions else 0.0
     print(f"\n{'='*50}")
     print(f"Results:")
     print(f"Total images: {total_predictions}")
     print(f"Correct predictions: {correct_predictions}")
     print(f"Wrong predictions: {total_predictions - correct_predictions}")
+    if unreadable:
+        print(f"Unreadable images (counted as wrong): {len(unreadable)}")
     print(f"Accuracy: {accuracy:.2f}%")
     print(f"{'='*50}")
     
@@ -89,15 +112,19 @@ def test_model(model_path, test_dir, results_json_path):
 
 if __name__ == '__main__':
     model_path = 'shape_model.h5'
-    test_dir = 'data/test'
-    results_json_path = 'data/test/results.json'
+    # optional argument: another test directory, or a shard directory written by shards.py
+    test_dir = sys.argv[1] if len(sys.argv) > 1 else 'data/test'
+    results_json_path = os.path.join(test_dir, 'results.json')
     
     if not os.path.exists(model_path):
         print(f"Error: Model file '{model_path}' not found!")
         print("Please train the model first by running main.py")
     elif not os.path.exists(test_dir):
         print(f"Error: Test directory '{test_dir}' not found!")
-    elif not os.path.exists(results_json_path):
+    elif not shards.is_shard_dir(test_dir) and not os.path.exists(results_json_path):
         print(f"Error: Results file '{results_json_path}' not found!")
+    elif shards.is_shard_dir(test_dir) and 'test' not in shards.splits(test_dir):
+        print(f"Error: Shard directory '{test_dir}' has no test split!")
+        print("Pack a data directory that contains test/ with shards.py")
     else:
         test_model(model_path, test_dir, results_json_path)
\ No newline at end of file
@@ -0,0 +1,313 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Pas d'affichage dans les processus de travail : seulement des fichiers PNG
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+import librosa
+import soundfile as sf
+import filters
+from stream import Noise, process_array
+from render import save_plots
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac', '.ogg', '.aiff', '.aif')
+OPERATIONS = ('remove-silence', 'speed', 'add-noise', 'lowpass', 'plots')
+# speed n'a pas de facteur par défaut : il ne s'ajoute à la chaîne qu'avec --speed
+DEFAULT_OPS = ('remove-silence', 'add-noise', 'lowpass', 'plots')
+DEFAULT_OUTPUT_DIR = 'batch_output'
+
+
+def list_inputs(sources):
+    """Fichiers audio des dossiers, des listes (un chemin par ligne) et chemins donnés directement"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(os.path.join(source, f) for f in os.listdir(source)
+                                if f.lower().endswith(AUDIO_EXTENSIONS)))
+        elif source.lower().endswith(AUDIO_EXTENSIONS):
+            paths.append(source)
+        else:
+            base = os.path.dirname(os.path.abspath(source))
+            with open(source) as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def output_names(paths):
+    """
+    Nom de sortie de chaque fichier, sans extension : chemin relatif au dossier
+    commun à tous les fichiers, extension d'origine comprise (d1/a.mp3 -> d1/a_mp3),
+    pour que d1/a.mp3, d2/a.mp3 et d1/a.wav n'écrivent pas dans les mêmes fichiers.
+    """
+    if not paths:
+        return []
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    names = []
+    for path in paths:
+        base, extension = os.path.splitext(os.path.relpath(os.path.abspath(path), root))
+        names.append(f"{base}_{extension[1:].lower()}")
+    return names
+
+
+def job_key(input_file, config):
+    """Empreinte du contenu du fichier et de la chaîne d'opérations (avec ses paramètres)"""
+    h = hashlib.sha256()
+    with open(input_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    h.update(b'\0' + json.dumps(config, sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _warm_up():
+    """
+    Initialisation de chaque processus : un premier passage de toute la chaîne
+    sur un signal court charge les imports paresseux de librosa/scipy et les
+    caches de matplotlib une fois pour toutes, pas à chaque fichier.
+    """
+    import matplotlib.pyplot as plt
+    sample_freq = 8000
+    signal_array = np.zeros((2, sample_freq), dtype=np.float32)
+    signal_array[:, 2000:6000] = np.sin(np.arange(4000) * 0.1) * 0.5
+    signal_array, _ = librosa.effects.trim(signal_array, top_db=20, aggregate=np.max)
+    signal_array = librosa.effects.time_stretch(signal_array, rate=1.5)
+    signal_array = process_array(signal_array, [Noise(0.01, 0)])
+    filters.apply(signal_array, filters.design('lowpass', 1000.0, sample_freq))
+    plt.figure()
+    plt.close()
+
+
+def run_job(input_file, name, config, output_dir, force=False):
+    """
+    Applique la chaîne d'opérations à un fichier, dans un processus de travail.
+
+    Le fichier n'est traité que si ses sorties manquent ou ont été produites à
+    partir d'un autre contenu ou d'autres paramètres (empreinte dans {nom}.json).
+
+    Args:
+        input_file: Chemin du fichier audio
+        name: Nom des sorties dans output_dir (voir output_names)
+        config: Opérations et paramètres (voir batch_main)
+        output_dir: Dossier de sortie
+        force: Traiter même si les sorties sont à jour
+
+    Returns:
+        Dictionnaire du rapport (statut, sorties, temps de chaque étape en ms)
+    """
+    start = time.perf_counter()
+    record = {'input': input_file}
+    timings = {}
+
+    def lap(name, t):
+        timings[name] = round((time.perf_counter() - t) * 1000, 1)
+        return time.perf_counter()
+
+    try:
+        t = time.perf_counter()
+        key = job_key(input_file, config)
+        t = lap('hash', t)
+        state_file = os.path.join(output_dir, f'{name}.json')
+        record['output'] = os.path.join(output_dir, f'{name}.wav')
+        os.makedirs(os.path.dirname(record['output']), exist_ok=True)
+
+        if not force and os.path.exists(state_file):
+            with open(state_file) as f:
+                state = json.load(f)
+            if state.get('key') == key and all(os.path.exists(p) for p in state['outputs']):
+                record['status'] = 'skipped'
+                record['outputs'] = state['outputs']
+                return record
+
+        # Charger l'audio une seule fois pour toute la chaîne
+        signal_array, sample_freq = librosa.load(input_file, sr=None, mono=False)
+        t = lap('load', t)
+
+        outputs = [record['output']]
+        for op in config['ops']:
+            if op == 'remove-silence':
+                # Même découpe que tp1.remove_silence : une décision pour tous les canaux
+                signal_array, _ = librosa.effects.trim(signal_array, top_db=config['top_db'], aggregate=np.max)
+            elif op == 'speed':
+                signal_array = librosa.effects.time_stretch(signal_array, rate=config['speed'])
+            elif op == 'add-noise':
+                # Bruit reproductible et différent pour chaque contenu si une graine est donnée
+                seed = None if config['seed'] is None else [config['seed'], int(key[:8], 16)]
+                signal_array = process_array(signal_array, [Noise(config['std'], seed)])
+            elif op == 'lowpass':
+                sos = filters.design('lowpass', config['cutoff'], sample_freq)
+                signal_array = filters.apply(signal_array, sos, zero_phase=config['zero_phase'])
+            elif op == 'plots':
+                outputs.extend(save_plots(signal_array, sample_freq, output_dir, f'{name}_'))
+            t = lap(op, t)
+
+        sf.write(record['output'], signal_array.T, sample_freq)
+        t = lap('write', t)
+
+        # L'empreinte est écrite en dernier : une sortie interrompue sera refaite
+        tmp_file = state_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'key': key, 'outputs': outputs}, f)
+        os.replace(tmp_file, state_file)
+
+        record['status'] = 'done'
+        record['outputs'] = outputs
+        record['samples'] = int(signal_array.shape[-1])
+        record['channels'] = 1 if signal_array.ndim == 1 else int(signal_array.shape[0])
+        record['sample_freq'] = sample_freq
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        record['timings_ms'] = timings
+        record['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return record
+
+
+def run_batch(paths, config, output_dir, workers=None, force=False, names=None):
+    """
+    Traite les fichiers dans un pool de processus déjà initialisés (_warm_up),
+    en produisant le rapport de chaque fichier dès qu'il est terminé.
+
+    Au plus 2 x workers fichiers sont soumis à la fois, la mémoire reste
+    bornée pour des listes de milliers de fichiers. names donne le nom des
+    sorties de chaque fichier (défaut: output_names(paths)).
+    """
+    workers = workers or os.cpu_count() or 1
+    if names is None:
+        names = output_names(paths)
+    os.makedirs(output_dir, exist_ok=True)
+    pending = set()
+    inputs = zip(paths, names)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up) as pool:
+        while True:
+            for path, name in inputs:
+                pending.add(pool.submit(run_job, path, name, config, output_dir, force))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def batch_main(args):
+    """Mode batch en ligne de commande : python batch.py <dossier|liste.txt|fichier>... [options]"""
+    sources = []
+    ops = None
+    output_dir = DEFAULT_OUTPUT_DIR
+    report = None
+    workers = None
+    force = False
+    config = {'top_db': 20.0, 'speed': None, 'std': 0.05, 'seed': None, 'cutoff': 3000.0, 'zero_phase': True}
+
+    # Parser les arguments
+    i = 0
+    while i < len(args):
+        if args[i] == '--ops' and i + 1 < len(args):
+            ops = [op.strip() for op in args[i + 1].split(',') if op.strip()]
+            i += 1
+        elif args[i] == '--output-dir' and i + 1 < len(args):
+            output_dir = args[i + 1]
+            i += 1
+        elif args[i] == '--report' and i + 1 < len(args):
+            report = args[i + 1]
+            i += 1
+        elif args[i] == '--workers' and i + 1 < len(args):
+            workers = int(args[i + 1])
+            i += 1
+        elif args[i] == '--top-db' and i + 1 < len(args):
+            config['top_db'] = float(args[i + 1])
+            i += 1
+        elif args[i] == '--speed' and i + 1 < len(args):
+            config['speed'] = float(args[i + 1])
+            i += 1
+        elif args[i] == '--std' and i + 1 < len(args):
+            config['std'] = float(args[i + 1])
+            i += 1
+        elif args[i] == '--seed' and i + 1 < len(args):
+            config['seed'] = int(args[i + 1])
+            i += 1
+        elif args[i] == '--cutoff' and i + 1 < len(args):
+            config['cutoff'] = float(args[i + 1])
+            i += 1
+        elif args[i] == '--causal':
+            config['zero_phase'] = False
+        elif args[i] == '--force':
+            force = True
+        else:
+            sources.append(args[i])
+        i += 1
+
+    if not sources:
+        print("Usage: python batch.py <dossier|liste.txt|fichier>... [options]")
+        print("\nOptions:")
+        print(f"  --ops <op,op,...>     Opérations dans l'ordre (défaut: {','.join(DEFAULT_OPS)},")
+        print("                        avec speed après remove-silence si --speed est donné)")
+        print("  --output-dir <dir>    Dossier de sortie (défaut: batch_output)")
+        print("  --report <file>       Rapport JSON lines (défaut: sortie standard)")
+        print("  --workers <int>       Nombre de processus (défaut: nombre de cœurs)")
+        print("  --force               Retraiter les fichiers déjà à jour")
+        print("  --top-db <float>      Seuil de remove-silence en dB (défaut: 20)")
+        print("  --speed <float>       Facteur de l'opération speed (obligatoire avec speed)")
+        print("  --std <float>         Déviation standard de add-noise (défaut: 0.05)")
+        print("  --seed <int>          Graine de add-noise (optionnel)")
+        print("  --cutoff <float>      Fréquence de coupure de lowpass en Hz (défaut: 3000.0)")
+        print("  --causal              Filtrage lowpass causal (défaut: aller-retour sans déphasage)")
+        print("\nExemple:")
+        print("  python batch.py clips/ --speed 1.5 --seed 42")
+        return 1
+
+    if ops is None:
+        ops = list(OPERATIONS if config['speed'] is not None else DEFAULT_OPS)
+    invalid = [op for op in ops if op not in OPERATIONS]
+    if invalid:
+        print(f"Erreur: Opération(s) invalide(s) {', '.join(invalid)}. Utilisez {', '.join(OPERATIONS)}.")
+        return 1
+    if 'speed' in ops and config['speed'] is None:
+        print("Erreur: L'opération speed demande --speed <facteur>.")
+        return 1
+    config['ops'] = ops
+
+    # Un fichier cité plusieurs fois n'est traité qu'une fois
+    unique = {}
+    for path in list_inputs(sources):
+        unique.setdefault(os.path.realpath(path), path)
+    paths = list(unique.values())
+    names = output_names(paths)
+    # Noms comparés sans la casse : identiques sur un système de fichiers insensible à la casse
+    seen = {}
+    for path, name in zip(paths, names):
+        if name.lower() in seen:
+            print(f"Erreur: '{seen[name.lower()]}' et '{path}' écriraient les mêmes sorties ({name}.wav).")
+            return 1
+        seen[name.lower()] = path
+
+    out = open(report, 'w') if report else sys.stdout
+    counts = {'done': 0, 'skipped': 0, 'error': 0}
+    start = time.perf_counter()
+    try:
+        for record in run_batch(paths, config, output_dir, workers, force, names):
+            counts[record['status']] += 1
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if report:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} fichiers en {elapsed:.2f} s ({len(paths) / elapsed if elapsed > 0 else 0.0:.1f} fichiers/s) : "
+          f"{counts['done']} traités, {counts['skipped']} à jour, {counts['error']} erreurs", file=sys.stderr)
+    return 1 if counts['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(batch_main(sys.argv[1:]))
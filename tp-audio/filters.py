@@ -0,0 +1,99 @@
+import numpy as np
+from scipy import signal
+
+FILTER_TYPES = ('lowpass', 'highpass', 'bandpass')
+
+
+def design(btype, cutoff, sample_freq, order=4):
+    """
+    Crée un filtre Butterworth en sections du second ordre (sos).
+
+    Les sections du second ordre restent stables numériquement aux ordres
+    élevés et aux fréquences de coupure basses, contrairement à la forme (b, a).
+
+    Args:
+        btype: 'lowpass', 'highpass' ou 'bandpass'
+        cutoff: Fréquence de coupure en Hz, ou (basse, haute) pour 'bandpass'
+        sample_freq: Fréquence d'échantillonnage
+        order: Ordre du filtre (défaut: 4)
+
+    Returns:
+        Tableau sos de forme (n_sections, 6)
+    """
+    if btype not in FILTER_TYPES:
+        raise ValueError(f"Type de filtre invalide '{btype}', utilisez {', '.join(FILTER_TYPES)}")
+    if btype == 'bandpass':
+        low, high = cutoff
+        if not 0 < low < high:
+            raise ValueError(f"Bande invalide: {low}-{high} Hz")
+    elif np.ndim(cutoff) != 0:
+        raise ValueError(f"Le filtre {btype} attend une seule fréquence de coupure")
+
+    # Vérifier que les fréquences de coupure sont valides
+    nyquist = sample_freq / 2.0
+    normal_cutoff = np.atleast_1d(cutoff) / nyquist
+    if (normal_cutoff >= 1.0).any():
+        print(f"Attention: La fréquence de coupure ({cutoff} Hz) est trop élevée pour la fréquence d'échantillonnage ({sample_freq} Hz).")
+        print(f"Utilisation de {nyquist * 0.95:.1f} Hz comme fréquence de coupure maximale.")
+        normal_cutoff = np.minimum(normal_cutoff, 0.95)
+        if btype == 'bandpass' and normal_cutoff[0] >= normal_cutoff[1]:
+            raise ValueError(f"Bande invalide: la fréquence basse ({cutoff[0]} Hz) doit être inférieure "
+                             f"à {nyquist * 0.95:.1f} Hz pour cette fréquence d'échantillonnage")
+    if btype != 'bandpass':
+        normal_cutoff = normal_cutoff[0]
+
+    return signal.butter(order, normal_cutoff, btype=btype, output='sos')
+
+
+class SosFilter:
+    """
+    Filtre sos causal avec état : chaque appel à process() reprend là où le
+    précédent s'est arrêté (flux en temps réel, fichier lu par blocs).
+
+    Tous les canaux sont filtrés en un seul appel à sosfilt, le long de l'axe
+    des échantillons.
+    """
+
+    def __init__(self, sos, axis=-1):
+        """
+        Args:
+            sos: Filtre en sections du second ordre (voir design())
+            axis: Axe des échantillons (-1 pour le format librosa, 0 pour soundfile)
+        """
+        self.sos = sos
+        self.axis = axis
+        self.zi = None
+
+    def process(self, block):
+        if self.zi is None:
+            # Conditions initiales nulles, comme sosfilt sans zi
+            shape = list(block.shape)
+            shape[self.axis] = 2
+            self.zi = np.zeros((self.sos.shape[0], *shape))
+        filtered, self.zi = signal.sosfilt(self.sos, block, axis=self.axis, zi=self.zi)
+        return filtered.astype(block.dtype, copy=False)
+
+    def reset(self):
+        """Oublie l'état (début d'un nouveau signal)."""
+        self.zi = None
+
+
+def apply(signal_array, sos, zero_phase=False, axis=-1):
+    """
+    Filtre un signal complet, tous les canaux en un seul appel.
+
+    Args:
+        signal_array: Signal (n_samples,) ou (n_channels, n_samples)
+        sos: Filtre en sections du second ordre (voir design())
+        zero_phase: Filtrage aller-retour sans déphasage (sosfiltfilt), hors ligne
+            uniquement : deux passes et tout le signal en mémoire
+        axis: Axe des échantillons
+
+    Returns:
+        Signal filtré, de même forme et même type
+    """
+    if zero_phase:
+        filtered = signal.sosfiltfilt(sos, signal_array, axis=axis)
+    else:
+        filtered = signal.sosfilt(sos, signal_array, axis=axis)
+    return filtered.astype(signal_array.dtype, copy=False)
@@ -0,0 +1,155 @@
+import os
+import numpy as np
+import scipy.fft
+import matplotlib.pyplot as plt
+
+# Taille des figures : 10 x 5 pouces à 150 dpi, soit 1500 colonnes de pixels
+FIGSIZE = (10, 5)
+DPI = 150
+COLUMNS = FIGSIZE[0] * DPI
+
+# Paramètres de plt.specgram (valeurs par défaut de matplotlib)
+NFFT = 256
+NOVERLAP = 128
+VMIN, VMAX = -20, 50
+
+# Nombre maximal de trames de STFT calculées à la fois
+CHUNK_FRAMES = 8192
+
+
+def waveform_envelope(samples, columns=COLUMNS):
+    """
+    Réduit un signal à son minimum et son maximum par colonne de pixels.
+
+    Un tracé de quelques milliers de segments verticaux est visuellement
+    identique au tracé de tous les échantillons, quelle que soit la durée.
+
+    Args:
+        samples: Signal (n_channels, n_samples)
+        columns: Nombre de colonnes
+
+    Returns:
+        (temps en échantillons (columns,), minimums, maximums (n_channels, columns)),
+        ou None si le signal est assez court pour être tracé tel quel
+    """
+    n_samples = samples.shape[-1]
+    if n_samples <= 2 * columns:
+        return None
+    edges = np.linspace(0, n_samples, columns + 1).astype(np.int64)
+    mins = np.minimum.reduceat(samples, edges[:-1], axis=-1)
+    maxs = np.maximum.reduceat(samples, edges[:-1], axis=-1)
+    return (edges[:-1] + edges[1:]) / 2, mins, maxs
+
+
+def spectrogram(samples, sample_freq, columns=COLUMNS):
+    """
+    Spectrogramme en dB de tous les canaux, avec la même échelle que plt.specgram.
+
+    Une seule STFT (fenêtre de Hann de NFFT échantillons, recouvrement NOVERLAP)
+    est calculée pour tous les canaux, par paquets de trames pour limiter la
+    mémoire. Au-delà de `columns` trames, la puissance des trames voisines est
+    moyennée pour n'en garder qu'une par colonne de pixels.
+
+    Args:
+        samples: Signal (n_channels, n_samples)
+        sample_freq: Fréquence d'échantillonnage
+        columns: Nombre maximal de colonnes
+
+    Returns:
+        (densité spectrale en dB (n_channels, NFFT // 2 + 1, n_columns), extent pour imshow)
+    """
+    if samples.shape[-1] < NFFT:
+        samples = np.pad(samples, ((0, 0), (0, NFFT - samples.shape[-1])))
+    step = NFFT - NOVERLAP
+    n_frames = (samples.shape[-1] - NOVERLAP) // step
+    frames = np.lib.stride_tricks.sliding_window_view(samples, NFFT, axis=-1)[:, ::step][:, :n_frames]
+    window = np.hanning(NFFT).astype(samples.dtype)
+
+    # Trames moyennées par colonne (1 si le signal est court : identique à specgram)
+    group = -(-n_frames // columns)
+    chunk = group * max(1, CHUNK_FRAMES // group)
+    power = np.empty((samples.shape[0], NFFT // 2 + 1, -(-n_frames // group)))
+    for start in range(0, n_frames, chunk):
+        # scipy.fft garde la précision float32 du signal : deux fois plus rapide que np.fft
+        spectrum = scipy.fft.rfft(frames[:, start:start + chunk] * window, axis=-1)
+        spectrum = spectrum.real ** 2 + spectrum.imag ** 2
+        # La dernière colonne peut contenir moins de trames
+        starts = np.arange(0, spectrum.shape[1], group)
+        counts = np.diff(np.append(starts, spectrum.shape[1]))
+        means = np.add.reduceat(spectrum, starts, axis=1, dtype=np.float64) / counts[:, None]
+        power[:, :, start // group:start // group + len(starts)] = means.transpose(0, 2, 1)
+
+    # Densité spectrale de puissance unilatérale, comme matplotlib.mlab.specgram
+    power /= sample_freq * (window.astype(np.float64) ** 2).sum()
+    power[:, 1:-1] *= 2
+    with np.errstate(divide='ignore'):
+        power_db = 10 * np.log10(power)
+
+    # Centres de la première et de la dernière trame, étendus d'une demi-trame
+    pad = step / sample_freq / 2
+    extent = (NFFT / 2 / sample_freq - pad, (NFFT / 2 + (n_frames - 1) * step) / sample_freq + pad,
+              0, sample_freq / 2)
+    return power_db, extent
+
+
+def save_plots(signal_array, sample_freq, output_dir='.', prefix='', title_suffix=''):
+    """
+    Sauvegarde les graphiques d'amplitude et les spectrogrammes des canaux gauche et droit.
+
+    Le signal est parcouru une seule fois (enveloppes et STFT des deux canaux),
+    puis les quatre figures sont tracées à partir de données réduites à la
+    largeur de l'image : le temps de tracé ne dépend pas de la durée de l'audio.
+
+    Args:
+        signal_array: Signal au format librosa, (n_samples,) ou (n_channels, n_samples)
+        sample_freq: Fréquence d'échantillonnage
+        output_dir: Dossier de sortie
+        prefix: Préfixe des noms de fichiers (ex. 'hello_noisy_')
+        title_suffix: Suffixe des titres (ex. ' (avec bruit)')
+
+    Returns:
+        Chemins des graphiques : canal gauche, canal droit, spectrogrammes gauche et droit
+    """
+    # Canaux gauche et droit à l'échelle int16 (comme dans tp1.py) ; en mono, le même canal deux fois
+    signal_array = np.atleast_2d(signal_array)
+    channels = signal_array[:2] if signal_array.shape[0] >= 2 else signal_array[[0, 0]]
+    # (valeurs tronquées comme par astype(np.int16), sans copie int16 du signal)
+    channels = np.trunc(channels.astype(np.float32) * 32767)
+    n_samples = channels.shape[-1]
+    t_audio = n_samples / sample_freq
+
+    envelope = waveform_envelope(channels)
+    power_db, extent = spectrogram(channels, sample_freq)
+
+    # fig.savefig plutôt que plt.savefig, qui redessine la figure une fois de plus après l'avoir sauvegardée
+    paths = []
+    for index, name, title in ((0, 'canal_gauche', 'Canal Gauche'), (1, 'canal_droit', 'Canal Droit')):
+        fig = plt.figure(figsize=FIGSIZE)
+        if envelope is None:
+            plt.plot(np.arange(n_samples) / sample_freq, channels[index])
+        else:
+            times, mins, maxs = envelope
+            plt.fill_between(times / sample_freq, mins[index], maxs[index], linewidth=0.5, edgecolor='C0')
+        plt.title(title + title_suffix)
+        plt.ylabel('Valeur du Signal')
+        plt.xlabel('Temps (s)')
+        plt.xlim(0, t_audio)
+        plt.tight_layout()
+        paths.append(os.path.join(output_dir, f'{prefix}{name}.png'))
+        fig.savefig(paths[-1], dpi=DPI, bbox_inches='tight')
+        plt.close(fig)
+
+    for index, name, title in ((0, 'canal_gauche', 'Canal Gauche'), (1, 'canal_droit', 'Canal Droit')):
+        fig = plt.figure(figsize=FIGSIZE)
+        plt.imshow(power_db[index], origin='lower', aspect='auto', extent=extent, vmin=VMIN, vmax=VMAX)
+        plt.title('Spectrogramme - ' + title + title_suffix)
+        plt.ylabel('Fréquence (Hz)')
+        plt.xlabel('Temps (s)')
+        plt.xlim(0, t_audio)
+        plt.colorbar()
+        plt.tight_layout()
+        paths.append(os.path.join(output_dir, f'{prefix}spectrogramme_{name}.png'))
+        fig.savefig(paths[-1], dpi=DPI, bbox_inches='tight')
+        plt.close(fig)
+
+    return paths
@@ -0,0 +1,174 @@
+import sys
+import numpy as np
+import soundfile as sf
+from filters import SosFilter, design
+
+# Nombre d'échantillons (par canal) lus à chaque bloc
+BLOCKSIZE = 65536
+
+
+class Gain:
+    """Multiplie le signal par un facteur constant."""
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def process(self, block):
+        return (block * self.factor).astype(block.dtype, copy=False)
+
+
+class Noise:
+    """
+    Ajoute du bruit gaussien (bruit blanc).
+
+    Le générateur est consommé dans l'ordre des échantillons, bloc après bloc :
+    avec la même graine, le bruit est identique quelle que soit la taille des blocs.
+    """
+
+    def __init__(self, std_noise, seed=None):
+        """
+        Args:
+            std_noise: Déviation standard du bruit
+            seed: Graine ou np.random.Generator (optionnel)
+        """
+        self.std_noise = std_noise
+        self.rng = np.random.default_rng(seed)
+
+    def process(self, block):
+        return (block + self.rng.normal(0, self.std_noise, block.shape)).astype(block.dtype, copy=False)
+
+
+class Filter(SosFilter):
+    """
+    Filtre sos (voir filters.design()) appliqué aux blocs (n_samples, n_channels).
+
+    L'état interne du filtre (zi) est conservé d'un bloc à l'autre, donc le
+    résultat est le même que sosfilt appliqué au fichier entier.
+    """
+
+    def __init__(self, sos):
+        super().__init__(sos, axis=0)
+
+
+def read_blocks(f, blocksize=BLOCKSIZE):
+    """
+    Lit un sf.SoundFile ouvert par blocs float32 (n_samples, n_channels).
+
+    Contrairement à sf.blocks(), la lecture s'arrête à la vraie fin des données :
+    pour les formats compressés (MP3...) le nombre d'échantillons de l'en-tête
+    n'est qu'une estimation et sf.blocks() ajouterait des zéros à la fin.
+    """
+    while True:
+        block = f.read(blocksize, dtype='float32', always_2d=True)
+        if len(block) == 0:
+            return
+        yield block
+
+
+def process_array(signal_array, stages):
+    """
+    Applique les étapes à un signal entièrement chargé en mémoire (en un seul bloc).
+
+    Args:
+        signal_array: Signal au format librosa, (n_samples,) ou (n_channels, n_samples)
+        stages: Liste d'étapes (Gain, Noise, Filter...)
+
+    Returns:
+        Signal traité, de même forme
+    """
+    # Les blocs de soundfile sont au format (n_samples, n_channels)
+    block = np.atleast_2d(signal_array).T
+    for stage in stages:
+        block = stage.process(block)
+    return block.T.reshape(signal_array.shape)
+
+
+def process_file(input_file, output_file, stages, blocksize=BLOCKSIZE):
+    """
+    Traite un fichier audio par blocs de taille fixe, à mémoire constante.
+
+    Le fichier n'est jamais chargé en entier : chaque bloc est lu, passe par
+    toutes les étapes puis est écrit avant de lire le suivant. Le résultat est
+    identique à process_array() sur le fichier complet.
+
+    Args:
+        input_file: Chemin vers le fichier audio d'entrée
+        output_file: Chemin du fichier de sortie (format déduit de l'extension)
+        stages: Liste d'étapes (Gain, Noise, Filter...)
+        blocksize: Nombre d'échantillons par bloc
+
+    Returns:
+        Chemin du fichier sauvegardé
+    """
+    with sf.SoundFile(input_file) as f, \
+            sf.SoundFile(output_file, 'w', f.samplerate, f.channels) as out:
+        for block in read_blocks(f, blocksize):
+            for stage in stages:
+                block = stage.process(block)
+            out.write(block)
+    return output_file
+
+
+def main():
+    """Fonction principale."""
+    if len(sys.argv) < 3:
+        print("Usage: python stream.py <entrée> <sortie> [étapes...] [--blocksize N]")
+        print("\nÉtapes (appliquées dans l'ordre de la ligne de commande):")
+        print("  --gain <float>       Multiplier le signal par un facteur")
+        print("  --noise <float>      Ajouter du bruit gaussien (déviation standard)")
+        print("  --seed <int>         Graine du bruit (optionnel)")
+        print("  --lowpass <float>    Filtre passe-bas Butterworth d'ordre 4 (Hz)")
+        print("  --highpass <float>   Filtre passe-haut Butterworth d'ordre 4 (Hz)")
+        print("  --bandpass <basse> <haute>  Filtre passe-bande Butterworth d'ordre 4 (Hz)")
+        print("\nExemple:")
+        print("  python stream.py long.wav long_filtre.wav --noise 0.01 --lowpass 3000")
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+    output_file = sys.argv[2]
+    sample_freq = sf.info(input_file).samplerate
+    blocksize = BLOCKSIZE
+    seed = None
+    stages = []
+
+    def make_filter(btype, cutoff):
+        try:
+            return Filter(design(btype, cutoff, sample_freq))
+        except ValueError as e:
+            print(f"Erreur: {e}.")
+            sys.exit(1)
+
+    # Parser les arguments
+    i = 3
+    while i < len(sys.argv):
+        if sys.argv[i] == '--gain' and i + 1 < len(sys.argv):
+            stages.append(Gain(float(sys.argv[i + 1])))
+        elif sys.argv[i] == '--noise' and i + 1 < len(sys.argv):
+            stages.append(Noise(float(sys.argv[i + 1])))
+        elif sys.argv[i] == '--seed' and i + 1 < len(sys.argv):
+            seed = int(sys.argv[i + 1])
+        elif sys.argv[i] in ('--lowpass', '--highpass') and i + 1 < len(sys.argv):
+            stages.append(make_filter(sys.argv[i][2:], float(sys.argv[i + 1])))
+        elif sys.argv[i] == '--bandpass' and i + 2 < len(sys.argv):
+            band = (float(sys.argv[i + 1]), float(sys.argv[i + 2]))
+            stages.append(make_filter('bandpass', band))
+            i += 1
+        elif sys.argv[i] == '--blocksize' and i + 1 < len(sys.argv):
+            blocksize = int(sys.argv[i + 1])
+        else:
+            print(f"Erreur: Option invalide '{sys.argv[i]}'.")
+            sys.exit(1)
+        i += 2
+
+    # Un seul générateur partagé par les étapes de bruit, initialisé avec la graine
+    rng = np.random.default_rng(seed)
+    for stage in stages:
+        if isinstance(stage, Noise):
+            stage.rng = rng
+
+    process_file(input_file, output_file, stages, blocksize)
+    print(f"✅ Fichier traité par blocs de {blocksize} échantillons sauvegardé: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import librosa
 import soundfile as sf
 import sys
 import os
+from render import save_plots
 
 def change_audio_speed(input_file, speed_factor, output_file=None):
     """
@@ -21,15 +21,9 @@ def change_audio_speed(input_file, speed_factor, output_file=None):
     signal_array, sample_freq = librosa.load(input_file, sr=None, mono=False)
     
     # Modifier la vitesse avec time_stretch (préserve la hauteur)
-    if signal_array.ndim == 1:
-        # Mono
-        signal_stretched = librosa.effects.time_stretch(signal_array, rate=speed_factor)
-    else:
-        # Stéréo - traiter chaque canal séparément
-        signal_stretched = np.array([
-            librosa.effects.time_stretch(signal_array[0], rate=speed_factor),
-            librosa.effects.time_stretch(signal_array[1], rate=speed_factor)
-        ])
+    # Mono ou N canaux (n_channels, n_samples) : une seule STFT de tous les canaux,
+    # qui restent synchronisés
+    signal_stretched = librosa.effects.time_stretch(signal_array, rate=speed_factor)
     
     # Générer le nom de fichier de sortie
     if output_file is None:
@@ -62,19 +56,9 @@ def remove_silence(input_file, top_db=20, output_file=None):
     signal_array, sample_freq = librosa.load(input_file, sr=None, mono=False)
     
     # Enlever les silences
-    if signal_array.ndim == 1:
-        # Mono
-        signal_cropped, _ = librosa.effects.trim(signal_array, top_db=top_db)
-    else:
-        # Stéréo - traiter chaque canal séparément
-        signal_cropped_left, _ = librosa.effects.trim(signal_array[0], top_db=top_db)
-        signal_cropped_right, _ = librosa.effects.trim(signal_array[1], top_db=top_db)
-        # Trouver la longueur minimale pour garder les canaux synchronisés
-        min_len = min(len(signal_cropped_left), len(signal_cropped_right))
-        signal_cropped = np.array([
-            signal_cropped_left[:min_len],
-            signal_cropped_right[:min_len]
-        ])
+    # Mono ou N canaux : une seule décision de découpe pour tous les canaux, une
+    # trame est silencieuse si elle est sous le seuil dans chacun des canaux
+    signal_cropped, _ = librosa.effects.trim(signal_array, top_db=top_db, aggregate=np.max)
     
     # Générer le nom de fichier de sortie
     if output_file is None:
@@ -145,13 +129,9 @@ def main():
     if signal_array.ndim == 1:
         n_channels = 1
         n_samples = len(signal_array)
-        # Convertir en int16 (librosa charge en float32 normalisé [-1, 1])
-        signal_array = (signal_array * 32767).astype(np.int16)
     else:
         n_channels = signal_array.shape[0]
         n_samples = signal_array.shape[1]
-        # Convertir en int16 pour chaque canal
-        signal_array = (signal_array * 32767).astype(np.int16)
 
     # Calculer la durée
     t_audio = n_samples / sample_freq
@@ -171,74 +151,13 @@ def main():
     print("Si cette valeur est supérieure à " + str(n_samples) + ", c'est en raison de la présence de plusieurs canaux.")
     print("Par exemple, Échantillons * Canaux = " + str(n_samples * n_channels))
 
-    # Diviser le signal en deux canaux : canal gauche (left) et canal droit (right)
-    if n_channels == 2:
-        # Si stéréo, librosa retourne (2, n_samples), on récupère les canaux
-        l_channel = signal_array[0]
-        r_channel = signal_array[1]
-    else:
-        # Si mono, on duplique le signal pour les deux canaux
-        l_channel = signal_array
-        r_channel = signal_array.copy()
-
-    # Générer des instants temporels (timestamps) pour chaque échantillon audio
-    timestamps = np.linspace(0, n_samples / sample_freq, num=n_samples)
-
-    # Créer un graphique pour le canal gauche (left channel)
-    plt.figure(figsize=(10, 5))
-    plt.plot(timestamps, l_channel)
-    plt.title('Canal Gauche')
-    plt.ylabel('Valeur du Signal')
-    plt.xlabel('Temps (s)')
-    plt.xlim(0, t_audio)
-    plt.tight_layout()
-    plt.savefig('canal_gauche.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print("Graphique du canal gauche sauvegardé: canal_gauche.png")
-
-    # Créer un graphique pour le canal droit (right channel)
-    plt.figure(figsize=(10, 5))
-    plt.plot(timestamps, r_channel)
-    plt.title('Canal Droit')
-    plt.ylabel('Valeur du Signal')
-    plt.xlabel('Temps (s)')
-    plt.xlim(0, t_audio)
-    plt.tight_layout()
-    plt.savefig('canal_droit.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print("Graphique du canal droit sauvegardé: canal_droit.png")
-
-    # Créer un graphique pour le spectrogramme du canal gauche (left channel)
-    plt.figure(figsize=(10, 5))
-    # Générer le spectrogramme du canal gauche (l_channel) avec les paramètres spécifiés
-    plt.specgram(l_channel, Fs=sample_freq, vmin=-20, vmax=50)
-    # Ajouter un titre au graphique
-    plt.title('Spectrogramme - Canal Gauche')
-    # Étiqueter l'axe des y avec "Fréquence (Hz)"
-    plt.ylabel('Fréquence (Hz)')
-    # Étiqueter l'axe des x avec "Temps (s)"
-    plt.xlabel('Temps (s)')
-    # Définir les limites de l'axe des x pour afficher uniquement la partie de l'audio correspondant à sa durée
-    plt.xlim(0, t_audio)
-    # Ajouter une barre de couleur pour indiquer l'intensité du spectre
-    plt.colorbar()
-    plt.tight_layout()
-    plt.savefig('spectrogramme_canal_gauche.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print("Spectrogramme du canal gauche sauvegardé: spectrogramme_canal_gauche.png")
-
-    # Répéter les mêmes étapes pour le canal droit (right channel)
-    plt.figure(figsize=(10, 5))
-    plt.specgram(r_channel, Fs=sample_freq, vmin=-20, vmax=50)
-    plt.title('Spectrogramme - Canal Droit')
-    plt.ylabel('Fréquence (Hz)')
-    plt.xlabel('Temps (s)')
-    plt.xlim(0, t_audio)
-    plt.colorbar()
-    plt.tight_layout()
-    plt.savefig('spectrogramme_canal_droit.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print("Spectrogramme du canal droit sauvegardé: spectrogramme_canal_droit.png")
+    # Graphiques d'amplitude et spectrogrammes des canaux gauche et droit (en mono, le
+    # même canal deux fois), calculés en un seul passage et réduits à la largeur de l'image
+    paths = save_plots(signal_array, sample_freq)
+    print(f"Graphique du canal gauche sauvegardé: {paths[0]}")
+    print(f"Graphique du canal droit sauvegardé: {paths[1]}")
+    print(f"Spectrogramme du canal gauche sauvegardé: {paths[2]}")
+    print(f"Spectrogramme du canal droit sauvegardé: {paths[3]}")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -4,10 +4,11 @@ import numpy as np
 import math
 import sys
 import os
-import matplotlib.pyplot as plt
-from scipy import signal
+import filters
+from stream import Noise, Filter, process_array, process_file, BLOCKSIZE
+from render import save_plots
 
-def add_noise(input_file, std_noise=0.05, output_file=None):
+def add_noise(input_file, std_noise=0.05, output_file=None, seed=None, stream=False, blocksize=BLOCKSIZE):
     """
     Ajoute du bruit gaussien (bruit blanc) à un fichier audio.
     
@@ -15,6 +16,9 @@ def add_noise(input_file, std_noise=0.05, output_file=None):
         input_file: Chemin vers le fichier audio d'entrée
         std_noise: Déviation standard du bruit (défaut: 0.05)
         output_file: Chemin du fichier de sortie (optionnel)
+        seed: Graine du bruit (optionnel, même bruit avec ou sans stream)
+        stream: Traiter le fichier par blocs à mémoire constante (sans graphiques)
+        blocksize: Nombre d'échantillons par bloc en mode stream
     
     Returns:
         Chemin du fichier sauvegardé
@@ -24,34 +28,30 @@ def add_noise(input_file, std_noise=0.05, output_file=None):
     noisy_dir = os.path.join(script_dir, 'noisy')
     os.makedirs(noisy_dir, exist_ok=True)
     
-    # Charger le signal audio
-    signal, sr = librosa.load(input_file, sr=None, mono=False)
-    
-    # Calculer le RMS (Root Mean Square) du signal original
-    if signal.ndim == 1:
-        # Mono
-        RMS = math.sqrt(np.mean(signal**2))
-        # Générer du bruit gaussien
-        noise = np.random.normal(0, std_noise, signal.shape[0])
-        # Ajouter le bruit au signal
-        signal_noise = signal + noise
-    else:
-        # Stéréo
-        RMS = math.sqrt(np.mean(signal**2))
-        # Générer du bruit pour chaque canal
-        noise = np.random.normal(0, std_noise, signal.shape)
-        # Ajouter le bruit au signal
-        signal_noise = signal + noise
-    
     # Générer le nom de fichier de sortie dans le dossier noisy
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
     if output_file is None:
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
         output_file = os.path.join(noisy_dir, f"{base_name}_noisy.wav")
     else:
         # Si un chemin de sortie est fourni, s'assurer qu'il est dans le dossier noisy
         if not os.path.isabs(output_file):
             output_file = os.path.join(noisy_dir, output_file)
     
+    if stream:
+        # Le fichier n'est jamais chargé en entier : pas de RMS global ni de graphiques
+        process_file(input_file, output_file, [Noise(std_noise, seed)], blocksize)
+        print(f"✅ Fichier audio avec bruit sauvegardé (par blocs de {blocksize} échantillons): {output_file}")
+        print(f"Déviation standard du bruit: {std_noise}")
+        return output_file
+    
+    # Charger le signal audio
+    signal, sr = librosa.load(input_file, sr=None, mono=False)
+    
+    # Calculer le RMS (Root Mean Square) du signal original
+    RMS = math.sqrt(np.mean(signal**2))
+    # Générer du bruit gaussien pour chaque canal et l'ajouter au signal
+    signal_noise = process_array(signal, [Noise(std_noise, seed)])
+    
     # Sauvegarder le fichier audio bruité
     if signal_noise.ndim == 1:
         sf.write(output_file, signal_noise, sr)
@@ -79,149 +79,84 @@ def generate_plots(signal_array, sample_freq, output_dir, base_name):
         output_dir: Dossier de sortie pour les graphiques
         base_name: Nom de base pour les fichiers
     """
-    # Convertir en int16 pour les graphiques (comme dans tp1.py)
-    if signal_array.ndim == 1:
-        n_channels = 1
-        n_samples = len(signal_array)
-        signal_int16 = (signal_array * 32767).astype(np.int16)
-    else:
-        n_channels = signal_array.shape[0]
-        n_samples = signal_array.shape[1]
-        signal_int16 = (signal_array * 32767).astype(np.int16)
-    
-    # Calculer la durée
-    t_audio = n_samples / sample_freq
-    
-    # Diviser le signal en deux canaux : canal gauche (left) et canal droit (right)
-    if n_channels == 2:
-        # Si stéréo, librosa retourne (2, n_samples), on récupère les canaux
-        l_channel = signal_int16[0]
-        r_channel = signal_int16[1]
-    else:
-        # Si mono, on duplique le signal pour les deux canaux
-        l_channel = signal_int16
-        r_channel = signal_int16.copy()
-    
-    # Générer des instants temporels (timestamps) pour chaque échantillon audio
-    timestamps = np.linspace(0, n_samples / sample_freq, num=n_samples)
-    
-    # Créer un graphique pour le canal gauche (left channel)
-    plt.figure(figsize=(10, 5))
-    plt.plot(timestamps, l_channel)
-    plt.title('Canal Gauche (avec bruit)')
-    plt.ylabel('Valeur du Signal')
-    plt.xlabel('Temps (s)')
-    plt.xlim(0, t_audio)
-    plt.tight_layout()
-    plot_path = os.path.join(output_dir, f'{base_name}_noisy_canal_gauche.png')
-    plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Graphique du canal gauche sauvegardé: {plot_path}")
-    
-    # Créer un graphique pour le canal droit (right channel)
-    plt.figure(figsize=(10, 5))
-    plt.plot(timestamps, r_channel)
-    plt.title('Canal Droit (avec bruit)')
-    plt.ylabel('Valeur du Signal')
-    plt.xlabel('Temps (s)')
-    plt.xlim(0, t_audio)
-    plt.tight_layout()
-    plot_path = os.path.join(output_dir, f'{base_name}_noisy_canal_droit.png')
-    plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Graphique du canal droit sauvegardé: {plot_path}")
-    
-    # Créer un graphique pour le spectrogramme du canal gauche (left channel)
-    plt.figure(figsize=(10, 5))
-    plt.specgram(l_channel, Fs=sample_freq, vmin=-20, vmax=50)
-    plt.title('Spectrogramme - Canal Gauche (avec bruit)')
-    plt.ylabel('Fréquence (Hz)')
-    plt.xlabel('Temps (s)')
-    plt.xlim(0, t_audio)
-    plt.colorbar()
-    plt.tight_layout()
-    plot_path = os.path.join(output_dir, f'{base_name}_noisy_spectrogramme_canal_gauche.png')
-    plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Spectrogramme du canal gauche sauvegardé: {plot_path}")
-    
-    # Répéter les mêmes étapes pour le canal droit (right channel)
-    plt.figure(figsize=(10, 5))
-    plt.specgram(r_channel, Fs=sample_freq, vmin=-20, vmax=50)
-    plt.title('Spectrogramme - Canal Droit (avec bruit)')
-    plt.ylabel('Fréquence (Hz)')
-    plt.xlabel('Temps (s)')
-    plt.xlim(0, t_audio)
-    plt.colorbar()
-    plt.tight_layout()
-    plot_path = os.path.join(output_dir, f'{base_name}_noisy_spectrogramme_canal_droit.png')
-    plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Spectrogramme du canal droit sauvegardé: {plot_path}")
+    # Les quatre figures en un seul passage sur le signal (enveloppes et STFT partagée)
+    paths = save_plots(signal_array, sample_freq, output_dir, f'{base_name}_noisy_', ' (avec bruit)')
+    print(f"Graphique du canal gauche sauvegardé: {paths[0]}")
+    print(f"Graphique du canal droit sauvegardé: {paths[1]}")
+    print(f"Spectrogramme du canal gauche sauvegardé: {paths[2]}")
+    print(f"Spectrogramme du canal droit sauvegardé: {paths[3]}")
 
-def apply_lowpass_filter(input_file, cutoff_freq=3000.0, output_file=None):
+def apply_filter(input_file, btype='lowpass', cutoff=3000.0, output_file=None, order=4,
+                 zero_phase=True, stream=False, blocksize=BLOCKSIZE):
     """
-    Applique un filtre passe-bas à un fichier audio pour réduire le bruit.
+    Applique un filtre Butterworth (passe-bas, passe-haut ou passe-bande) à un fichier audio.
+    
+    Par défaut le filtrage est aller-retour, sans déphasage (sosfiltfilt), comme
+    filtfilt auparavant : deux passes et tout le signal en mémoire. Avec
+    zero_phase=False le filtre est causal (sosfilt) : une seule passe, utilisable
+    sur un flux en temps réel ou un fichier lu par blocs (stream=True, toujours causal).
     
     Args:
-        input_file: Chemin vers le fichier audio bruité
-        cutoff_freq: Fréquence de coupure en Hz (défaut: 3000.0)
+        input_file: Chemin vers le fichier audio
+        btype: 'lowpass', 'highpass' ou 'bandpass' (défaut: 'lowpass')
+        cutoff: Fréquence de coupure en Hz, ou (basse, haute) pour 'bandpass'
         output_file: Chemin du fichier de sortie (optionnel)
+        order: Ordre du filtre (défaut: 4)
+        zero_phase: Filtrage aller-retour sans déphasage (défaut), False pour un filtre causal
+        stream: Traiter le fichier par blocs à mémoire constante (filtre causal, sans graphiques)
+        blocksize: Nombre d'échantillons par bloc en mode stream
     
     Returns:
         Chemin du fichier filtré
     """
+    # Le filtrage aller-retour demande tout le signal : par blocs, le filtre est causal
+    if stream:
+        zero_phase = False
+    
     # Créer le dossier filtered s'il n'existe pas
     script_dir = os.path.dirname(os.path.abspath(input_file)) if os.path.dirname(input_file) else os.getcwd()
     filtered_dir = os.path.join(script_dir, 'filtered')
     os.makedirs(filtered_dir, exist_ok=True)
     
-    # Charger l'audio bruité
-    noisy_signal, sample_freq = librosa.load(input_file, sr=None, mono=False)
-    
-    # Créer le filtre passe-bas Butterworth
-    nyquist = sample_freq / 2.0
-    normal_cutoff = cutoff_freq / nyquist
-    
-    # Vérifier que la fréquence de coupure est valide
-    if normal_cutoff >= 1.0:
-        print(f"Attention: La fréquence de coupure ({cutoff_freq} Hz) est trop élevée pour la fréquence d'échantillonnage ({sample_freq} Hz).")
-        print(f"Utilisation de {nyquist * 0.95:.1f} Hz comme fréquence de coupure maximale.")
-        normal_cutoff = 0.95
-    
-    # Créer le filtre Butterworth d'ordre 4
-    b, a = signal.butter(4, normal_cutoff, btype='low')
-    
-    # Appliquer le filtre
-    if noisy_signal.ndim == 1:
-        # Mono
-        filtered_signal = signal.filtfilt(b, a, noisy_signal)
-    else:
-        # Stéréo - filtrer chaque canal séparément
-        filtered_signal = np.array([
-            signal.filtfilt(b, a, noisy_signal[0]),
-            signal.filtfilt(b, a, noisy_signal[1])
-        ])
-    
     # Générer le nom de fichier de sortie
     if output_file is None:
         base_name = os.path.splitext(os.path.basename(input_file))[0]
         # Enlever "_noisy" du nom si présent
         if base_name.endswith('_noisy'):
             base_name = base_name[:-6]
-        output_file = os.path.join(filtered_dir, f"{base_name}_filtered_lowpass_{int(cutoff_freq)}Hz.wav")
+        freq_name = f"{int(cutoff[0])}-{int(cutoff[1])}" if btype == 'bandpass' else f"{int(cutoff)}"
+        output_file = os.path.join(filtered_dir, f"{base_name}_filtered_{btype}_{freq_name}Hz.wav")
     else:
         if not os.path.isabs(output_file):
             output_file = os.path.join(filtered_dir, output_file)
     
+    mode = "sans déphasage (sosfiltfilt)" if zero_phase else "causal (sosfilt)"
+    
+    if stream:
+        # Le filtre garde son état d'un bloc à l'autre : même résultat qu'en mémoire
+        sos = filters.design(btype, cutoff, sf.info(input_file).samplerate, order)
+        process_file(input_file, output_file, [Filter(sos)], blocksize)
+        print(f"✅ Fichier audio filtré ({btype}, {mode}) sauvegardé par blocs de {blocksize} échantillons: {output_file}")
+        print(f"Fréquence de coupure: {cutoff} Hz")
+        return output_file
+    
+    # Charger l'audio bruité
+    noisy_signal, sample_freq = librosa.load(input_file, sr=None, mono=False)
+    
+    # Créer le filtre Butterworth en sections du second ordre
+    sos = filters.design(btype, cutoff, sample_freq, order)
+    
+    # Appliquer le filtre à tous les canaux en un seul appel, le long de l'axe des échantillons
+    filtered_signal = filters.apply(noisy_signal, sos, zero_phase=zero_phase, axis=-1)
+    
     # Sauvegarder le fichier filtré
     if filtered_signal.ndim == 1:
         sf.write(output_file, filtered_signal, sample_freq)
     else:
         sf.write(output_file, filtered_signal.T, sample_freq)
     
-    print(f"✅ Fichier audio filtré (passe-bas) sauvegardé: {output_file}")
-    print(f"Fréquence de coupure: {cutoff_freq} Hz")
+    print(f"✅ Fichier audio filtré ({btype}, {mode}) sauvegardé: {output_file}")
+    print(f"Fréquence de coupure: {cutoff} Hz")
     print(f"Fréquence d'échantillonnage: {sample_freq} Hz")
     print(f"Forme du signal filtré: {filtered_signal.shape}")
     
@@ -231,22 +166,51 @@ def apply_lowpass_filter(input_file, cutoff_freq=3000.0, output_file=None):
     
     return output_file
 
+def apply_lowpass_filter(input_file, cutoff_freq=3000.0, output_file=None, zero_phase=True,
+                         stream=False, blocksize=BLOCKSIZE):
+    """
+    Applique un filtre passe-bas à un fichier audio pour réduire le bruit.
+    
+    Args:
+        input_file: Chemin vers le fichier audio bruité
+        cutoff_freq: Fréquence de coupure en Hz (défaut: 3000.0)
+        output_file: Chemin du fichier de sortie (optionnel)
+        zero_phase: Filtrage aller-retour sans déphasage (défaut), False pour un filtre causal
+        stream: Traiter le fichier par blocs à mémoire constante (filtre causal, sans graphiques)
+        blocksize: Nombre d'échantillons par bloc en mode stream
+    
+    Returns:
+        Chemin du fichier filtré
+    """
+    return apply_filter(input_file, 'lowpass', cutoff_freq, output_file,
+                        zero_phase=zero_phase, stream=stream, blocksize=blocksize)
+
 def main():
     """Fonction principale."""
     if len(sys.argv) < 3:
         print("Usage: python tp2.py <mode> <fichier_audio> [options]")
         print("\nModes:")
         print("  add-noise    Ajouter du bruit gaussien au fichier audio")
-        print("  filter       Appliquer un filtre passe-bas pour réduire le bruit")
+        print("  filter       Appliquer un filtre (passe-bas par défaut) pour réduire le bruit")
         print("\nOptions pour add-noise:")
         print("  --std <float>     Déviation standard du bruit (défaut: 0.05)")
         print("  --output <file>   Fichier de sortie (optionnel)")
+        print("  --seed <int>      Graine du bruit (optionnel)")
+        print("  --stream          Traiter par blocs à mémoire constante (sans graphiques)")
+        print("  --blocksize <int> Échantillons par bloc en mode stream (défaut: 65536)")
         print("\nOptions pour filter:")
+        print("  --type <type>     lowpass, highpass ou bandpass (défaut: lowpass)")
         print("  --cutoff <float>  Fréquence de coupure en Hz (défaut: 3000.0)")
+        print("  --band <basse> <haute>  Bande du filtre passe-bande en Hz")
+        print("  --order <int>     Ordre du filtre Butterworth (défaut: 4)")
+        print("  --causal          Filtre causal en une passe (défaut: aller-retour sans déphasage)")
+        print("  --stream          Traiter par blocs à mémoire constante (filtre causal, sans graphiques)")
+        print("  --blocksize <int> Échantillons par bloc en mode stream (défaut: 65536)")
         print("  --output <file>   Fichier de sortie (optionnel)")
         print("\nExemples:")
         print("  python tp2.py add-noise hello.mp3 --std 0.01")
         print("  python tp2.py filter noisy/hello_noisy.wav --cutoff 3000")
+        print("  python tp2.py filter noisy/hello_noisy.wav --band 300 3400 --causal")
         sys.exit(1)
     
     mode = sys.argv[1].lower()
@@ -259,6 +223,9 @@ def main():
     if mode == 'add-noise':
         std_noise = 0.05
         output_file = None
+        seed = None
+        stream = False
+        blocksize = BLOCKSIZE
         
         # Parser les arguments
         i = 3
@@ -266,16 +233,31 @@ def main():
             if sys.argv[i] == '--std' and i + 1 < len(sys.argv):
                 std_noise = float(sys.argv[i + 1])
                 i += 2
+            elif sys.argv[i] == '--seed' and i + 1 < len(sys.argv):
+                seed = int(sys.argv[i + 1])
+                i += 2
+            elif sys.argv[i] == '--stream':
+                stream = True
+                i += 1
+            elif sys.argv[i] == '--blocksize' and i + 1 < len(sys.argv):
+                blocksize = int(sys.argv[i + 1])
+                i += 2
             elif sys.argv[i] == '--output' and i + 1 < len(sys.argv):
                 output_file = sys.argv[i + 1]
                 i += 2
             else:
                 i += 1
         
-        add_noise(input_file, std_noise, output_file)
+        add_noise(input_file, std_noise, output_file, seed, stream, blocksize)
     
     elif mode == 'filter':
+        btype = 'lowpass'
         cutoff_freq = 3000.0
+        band = None
+        order = 4
+        zero_phase = True
+        stream = False
+        blocksize = BLOCKSIZE
         output_file = None
         
         # Parser les arguments
@@ -284,13 +266,44 @@ def main():
             if sys.argv[i] == '--cutoff' and i + 1 < len(sys.argv):
                 cutoff_freq = float(sys.argv[i + 1])
                 i += 2
+            elif sys.argv[i] == '--type' and i + 1 < len(sys.argv):
+                btype = sys.argv[i + 1]
+                i += 2
+            elif sys.argv[i] == '--band' and i + 2 < len(sys.argv):
+                btype = 'bandpass'
+                band = (float(sys.argv[i + 1]), float(sys.argv[i + 2]))
+                i += 3
+            elif sys.argv[i] == '--order' and i + 1 < len(sys.argv):
+                order = int(sys.argv[i + 1])
+                i += 2
+            elif sys.argv[i] == '--causal':
+                zero_phase = False
+                i += 1
+            elif sys.argv[i] == '--stream':
+                stream = True
+                i += 1
+            elif sys.argv[i] == '--blocksize' and i + 1 < len(sys.argv):
+                blocksize = int(sys.argv[i + 1])
+                i += 2
             elif sys.argv[i] == '--output' and i + 1 < len(sys.argv):
                 output_file = sys.argv[i + 1]
                 i += 2
             else:
                 i += 1
         
-        apply_lowpass_filter(input_file, cutoff_freq, output_file)
+        if btype not in filters.FILTER_TYPES:
+            print(f"Erreur: Type de filtre invalide '{btype}'. Utilisez 'lowpass', 'highpass' ou 'bandpass'.")
+            sys.exit(1)
+        if btype == 'bandpass' and band is None:
+            print("Erreur: Le filtre passe-bande demande --band <basse> <haute>.")
+            sys.exit(1)
+        
+        try:
+            apply_filter(input_file, btype, band if btype == 'bandpass' else cutoff_freq, output_file,
+                         order, zero_phase, stream, blocksize)
+        except ValueError as e:
+            print(f"Erreur: {e}.")
+            sys.exit(1)
     
     else:
         print(f"Erreur: Mode invalide '{mode}'. Utilisez 'add-noise' ou 'filter'.")
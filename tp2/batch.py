@@ -0,0 +1,322 @@
+import os
+import sys
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from main import find_roman_numeral, GeminiClient, DEFAULT_CACHE, MODEL_NAME, PROMPT
+from result_cache import ResultCache
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.gif', '.tif', '.tiff')
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: at most `rate` requests per second, bursts of `burst` (evenly spaced by default)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or 1.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def status_code(exc):
+    """HTTP status of an API error (google.api_core, urllib, requests), following __cause__"""
+    while exc is not None:
+        for attr in ('code', 'status_code'):
+            value = getattr(exc, attr, None)
+            if isinstance(value, int):
+                return value
+        response = getattr(exc, 'response', None)
+        if isinstance(getattr(response, 'status_code', None), int):
+            return response.status_code
+        exc = exc.__cause__
+    return None
+
+
+def retry_after(exc):
+    """Delay requested by the server in a Retry-After header, if any"""
+    headers = getattr(exc, 'headers', None)
+    try:
+        return float(headers.get('Retry-After')) if headers is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ReliableClient:
+    """
+    Wraps a client shared by all threads: token bucket before every request and
+    retries with exponential backoff (full jitter) on 429 and 5xx errors.
+
+    Cache hits never reach this client, so they use neither tokens nor retries.
+    """
+
+    def __init__(self, client, rate=None, retries=5, backoff=0.5, max_backoff=30.0):
+        """
+        Args:
+            client: Client with generate(prompt, image) and model_name
+            rate: Maximum requests per second (None: unlimited)
+            retries: Maximum number of retries of a request
+            backoff: First retry delay in seconds, doubled at each attempt
+            max_backoff: Upper bound of the retry delay
+        """
+        self.client = client
+        self.model_name = client.model_name
+        self.bucket = TokenBucket(rate) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.requests = 0
+        self.retried = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, image):
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            with self.lock:
+                self.requests += 1
+            try:
+                return self.client.generate(prompt, image)
+            except Exception as e:
+                if attempt >= self.retries or status_code(e) not in RETRY_STATUS:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                attempt += 1
+                with self.lock:
+                    self.retried += 1
+                time.sleep(delay)
+
+
+class LazyClient:
+    """
+    Builds the real client on the first request, so a batch answered entirely
+    from the cache needs neither an API key nor the Gemini SDK.
+    """
+
+    def __init__(self, factory, model_name):
+        """
+        Args:
+            factory: Callable returning a client with generate(prompt, image)
+            model_name: Model name of that client (part of the cache key)
+        """
+        self.factory = factory
+        self.model_name = model_name
+        self.client = None
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, image):
+        with self.lock:
+            if self.client is None:
+                self.client = self.factory()
+        return self.client.generate(prompt, image)
+
+
+class InFlight:
+    """
+    Coalesces concurrent analyses of identical images: the first thread for a
+    content hash does the work, the others wait for its result instead of
+    sending the same request.
+    """
+
+    def __init__(self):
+        self.futures = {}
+        self.coalesced = 0
+        self.lock = threading.Lock()
+
+    def run(self, key, fn):
+        with self.lock:
+            future = self.futures.get(key)
+            owner = future is None
+            if owner:
+                future = self.futures[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.futures[key]
+
+
+def list_inputs(sources):
+    """Image paths from directories, list files (one path per line) and image paths"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(os.path.join(source, f) for f in os.listdir(source)
+                                if f.lower().endswith(IMAGE_EXTENSIONS)))
+        elif source.lower().endswith(IMAGE_EXTENSIONS):
+            paths.append(source)
+        else:
+            base = os.path.dirname(os.path.abspath(source))
+            with open(source) as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def _analyze(path, client, cache, inflight=None):
+    start = time.perf_counter()
+    record = {'image': path}
+    try:
+        if inflight is None:
+            record['result'] = find_roman_numeral(path, client=client, cache=cache)
+        else:
+            with open(path, 'rb') as f:
+                key = ResultCache.key(f.read(), PROMPT, client.model_name)
+            record['result'] = inflight.run(key, lambda: find_roman_numeral(path, client=client, cache=cache))
+    except Exception as e:
+        record['error'] = str(e)
+    record['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return record
+
+
+def run_batch(paths, client, cache=None, concurrency=8, inflight=None):
+    """
+    Analyze images concurrently over one shared client, yielding one result dict
+    per image as soon as it completes.
+
+    At most 2 x concurrency images are in flight, so arbitrarily long lists are
+    processed with bounded memory. Identical images in flight at the same time
+    share one request (see InFlight).
+    """
+    if inflight is None:
+        inflight = InFlight()
+    pending = set()
+    inputs = iter(paths)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            for path in inputs:
+                pending.add(pool.submit(_analyze, path, client, cache, inflight))
+                if len(pending) >= 2 * concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def batch_main(args):
+    """Command-line batch mode: python main.py batch <dir|list.txt|image>... [options]"""
+    sources = []
+    output = None
+    concurrency = 8
+    rate = None
+    retries = 5
+    cache_path = DEFAULT_CACHE
+    ttl_days = 30.0
+    cache_mb = 64.0
+    mock_url = None
+    api_key = None
+
+    i = 0
+    while i < len(args):
+        if args[i] == '--output' and i + 1 < len(args):
+            output = args[i + 1]
+            i += 1
+        elif args[i] == '--concurrency' and i + 1 < len(args):
+            concurrency = int(args[i + 1])
+            i += 1
+        elif args[i] == '--rate' and i + 1 < len(args):
+            rate = float(args[i + 1])
+            i += 1
+        elif args[i] == '--retries' and i + 1 < len(args):
+            retries = int(args[i + 1])
+            i += 1
+        elif args[i] == '--cache' and i + 1 < len(args):
+            cache_path = args[i + 1]
+            i += 1
+        elif args[i] == '--cache-ttl' and i + 1 < len(args):
+            ttl_days = float(args[i + 1])
+            i += 1
+        elif args[i] == '--cache-size' and i + 1 < len(args):
+            cache_mb = float(args[i + 1])
+            i += 1
+        elif args[i] == '--no-cache':
+            cache_path = None
+        elif args[i] == '--mock' and i + 1 < len(args):
+            mock_url = args[i + 1]
+            i += 1
+        elif args[i] == '--api-key' and i + 1 < len(args):
+            api_key = args[i + 1]
+            i += 1
+        else:
+            sources.append(args[i])
+        i += 1
+
+    if not sources:
+        print("Usage: python main.py batch <dir|list.txt|image>... [options]")
+        print("\nOptions:")
+        print("  --output FILE       JSON lines output (default: stdout)")
+        print("  --concurrency N     concurrent requests (default: 8)")
+        print("  --rate R            at most R requests per second (token bucket)")
+        print("  --retries N         retries on 429/5xx with exponential backoff (default: 5)")
+        print("  --cache PATH        result cache (default: tp2/.cache/results.sqlite)")
+        print("  --cache-ttl DAYS    lifetime of cached results (default: 30)")
+        print("  --cache-size MB     size limit of the cache, least recently used evicted (default: 64)")
+        print("  --no-cache          always call the API")
+        print("  --mock URL          send requests to a mock_server.py instead of Gemini")
+        print("  --api-key KEY       Gemini API key (default: GEMINI_API_KEY from .env)")
+        return 1
+
+    paths = list_inputs(sources)
+    if mock_url:
+        from fake_client import MockServerClient
+        base_client = MockServerClient(mock_url)
+    else:
+        base_client = LazyClient(lambda: GeminiClient(api_key), MODEL_NAME)
+    client = ReliableClient(base_client, rate=rate, retries=retries)
+    cache = None
+    if cache_path:
+        cache = ResultCache(cache_path, ttl=ttl_days * 24 * 3600, max_bytes=int(cache_mb * 1024 * 1024))
+    inflight = InFlight()
+
+    out = open(output, 'w') if output else sys.stdout
+    errors = 0
+    start = time.perf_counter()
+    try:
+        for record in run_batch(paths, client, cache, concurrency, inflight):
+            errors += 'error' in record
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if output:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} images in {elapsed:.2f} s ({len(paths) / elapsed if elapsed > 0 else 0.0:.1f} images/s), "
+          f"{errors} errors, {client.requests} API requests, {client.retried} retries, "
+          f"{inflight.coalesced} duplicates coalesced"
+          + (f", {cache.hits} cache hits" if cache is not None else ""), file=sys.stderr)
+    return 1 if errors else 0
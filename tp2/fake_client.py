@@ -0,0 +1,60 @@
+import io
+import json
+import time
+import base64
+import threading
+import urllib.request
+
+
+class FakeClient:
+    """
+    Local stand-in for GeminiClient: no network, no API key, no billing.
+
+    Every image gets the `default` answer; each call sleeps `latency` seconds
+    and is counted, so cache hits and concurrency can be checked.
+    """
+
+    def __init__(self, default="IV", latency=0.0, model_name='fake-model'):
+        """
+        Args:
+            default: Answer returned for every image
+            latency: Simulated request time in seconds
+            model_name: Name used in the cache key
+        """
+        self.default = default
+        self.latency = latency
+        self.model_name = model_name
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, image):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.default
+
+
+class MockServerClient:
+    """Client of a local mock_server.py: same interface as GeminiClient, over HTTP"""
+
+    def __init__(self, url, model_name='mock-model', timeout=30.0):
+        """
+        Args:
+            url: Base URL of the mock server (e.g. http://127.0.0.1:8080)
+            model_name: Name sent to the server and used in the cache key
+            timeout: Request timeout in seconds
+        """
+        self.url = url.rstrip('/') + '/generate'
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def generate(self, prompt, image):
+        # urllib.error.HTTPError carries .code and the Retry-After header for the retries
+        buf = io.BytesIO()
+        image.save(buf, format='PNG')
+        body = json.dumps({'model': self.model_name, 'prompt': prompt,
+                           'image': base64.b64encode(buf.getvalue()).decode('ascii')}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())['text']
@@ -1,104 +1,193 @@
+import io
 import os
 import sys
-import google.generativeai as genai
 from PIL import Image
 from dotenv import load_dotenv
+from result_cache import ResultCache
+
+try:
+    import google.generativeai as genai
+except ImportError:  # only needed by GeminiClient, FakeClient works without it
+    genai = None
 
 # Load environment variables from .env file
 load_dotenv()
 
-def find_roman_numeral(image_path, api_key=None):
+MODEL_NAME = 'gemini-2.0-flash'
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'results.sqlite')
+
+# Prompt for Roman numeral detection (part of the cache key)
+PROMPT = """Analyze this image and identify any Roman numerals present. 
+    Roman numerals use the letters I, V, X, L, C, D, M.
+    
+    Respond with ONLY the Roman numeral(s) found in the image, separated by commas if multiple.
+    If no Roman numerals are found, respond with "No Roman numerals found".
+    
+    Be precise and only identify actual Roman numerals, not other text or symbols.
+    Do not provide explanations or additional text, just the numerals."""
+
+
+class GeminiClient:
+    """Gemini model configured once and reused for every request"""
+
+    def __init__(self, api_key=None, model_name=MODEL_NAME):
+        """
+        Args:
+            api_key: Google Gemini API key (optional, will use GEMINI_API_KEY from .env)
+            model_name: Gemini model to call
+        """
+        # Get API key from parameter, .env file, or environment variable
+        if api_key is None:
+            api_key = os.getenv('GEMINI_API_KEY')
+
+        if not api_key:
+            raise ValueError(
+                "API key not found. Please set GEMINI_API_KEY in your .env file "
+                "or pass it as a parameter. Get your API key from: "
+                "https://makersuite.google.com/app/apikey"
+            )
+        if genai is None:
+            raise ImportError("google-generativeai is not installed (pip install google-generativeai)")
+
+        # Configure the Gemini API
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt, image):
+        """Text answer of the model for a prompt and a PIL image"""
+        return self.model.generate_content([prompt, image]).text
+
+
+def parse_response(text):
+    """Keep the first line of the answer, without numbered list formatting"""
+    result = text.strip()
+    lines = result.split('\n')
+    if lines:
+        # Get the first non-empty line
+        first_line = lines[0].strip()
+        # Remove leading numbers and dots (e.g., "1. " or "2. ")
+        if first_line and first_line[0].isdigit() and len(first_line) > 2 and first_line[1] in ['.', ')']:
+            first_line = first_line[2:].strip()
+        result = first_line
+    return result
+
+def find_roman_numeral(image_path, api_key=None, client=None, cache=None):
     """
     Uses Gemini AI to find Roman numerals in an image.
     
     Args:
         image_path: Path to the input image file
         api_key: Google Gemini API key (optional, will use GEMINI_API_KEY from .env)
+        client: Object with generate(prompt, image) and model_name, e.g. a shared
+            GeminiClient or a FakeClient (default: a new GeminiClient)
+        cache: ResultCache consulted before calling the model (optional)
     
     Returns:
         The detected Roman numeral(s) as a string
     """
-    # Get API key from parameter, .env file, or environment variable
-    if api_key is None:
-        api_key = os.getenv('GEMINI_API_KEY')
-    
-    if not api_key:
-        raise ValueError(
-            "API key not found. Please set GEMINI_API_KEY in your .env file "
-            "or pass it as a parameter. Get your API key from: "
-            "https://makersuite.google.com/app/apikey"
-        )
-    
-    # Configure the Gemini API
-    genai.configure(api_key=api_key)
-    
-    # Initialize the model (using Gemini 1.5 Flash - supports vision and is faster)
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    
     # Load and verify the image
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image file not found: {image_path}")
+    with open(image_path, 'rb') as f:
+        image_bytes = f.read()
+
+    model_name = client.model_name if client is not None else MODEL_NAME
+
+    # An identical image already analyzed with the same prompt and model costs a local lookup
+    key = None
+    if cache is not None:
+        key = ResultCache.key(image_bytes, PROMPT, model_name)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if client is None:
+        client = GeminiClient(api_key)
     
     try:
-        img = Image.open(image_path)
+        img = Image.open(io.BytesIO(image_bytes))
     except Exception as e:
         raise ValueError(f"Error opening image: {e}")
     
-    # Create a prompt for Roman numeral detection
-    prompt = """Analyze this image and identify any Roman numerals present. 
-    Roman numerals use the letters I, V, X, L, C, D, M.
-    
-    Respond with ONLY the Roman numeral(s) found in the image, separated by commas if multiple.
-    If no Roman numerals are found, respond with "No Roman numerals found".
-    
-    Be precise and only identify actual Roman numerals, not other text or symbols.
-    Do not provide explanations or additional text, just the numerals."""
-    
     try:
         # Generate content using the image and prompt
-        response = model.generate_content([prompt, img])
-        
-        # Extract the text response
-        result = response.text.strip()
-        
-        # Clean up the response - take only the first line if multiple lines
-        # and remove numbered list formatting
-        lines = result.split('\n')
-        if lines:
-            # Get the first non-empty line
-            first_line = lines[0].strip()
-            # Remove leading numbers and dots (e.g., "1. " or "2. ")
-            if first_line and first_line[0].isdigit() and len(first_line) > 2 and first_line[1] in ['.', ')']:
-                first_line = first_line[2:].strip()
-            result = first_line
-        
-        return result
-    
+        result = parse_response(client.generate(PROMPT, img))
     except Exception as e:
-        raise RuntimeError(f"Error calling Gemini API: {e}")
+        # the original error stays in __cause__ (HTTP status used by the batch retries)
+        raise RuntimeError(f"Error calling Gemini API: {e}") from e
+
+    if cache is not None:
+        cache.put(key, model_name, result)
+    return result
 
 
 def main():
     """Main function to handle command-line usage."""
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <image_path> [api_key]")
+    if sys.argv[1:2] == ['batch']:
+        from batch import batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    positional = []
+    cache_path = DEFAULT_CACHE
+    ttl_days = 30.0
+    cache_mb = 64.0
+    fake = False
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] == '--no-cache':
+            cache_path = None
+        elif args[i] == '--cache' and i + 1 < len(args):
+            cache_path = args[i + 1]
+            i += 1
+        elif args[i] == '--cache-ttl' and i + 1 < len(args):
+            ttl_days = float(args[i + 1])
+            i += 1
+        elif args[i] == '--cache-size' and i + 1 < len(args):
+            cache_mb = float(args[i + 1])
+            i += 1
+        elif args[i] == '--fake':
+            fake = True
+        else:
+            positional.append(args[i])
+        i += 1
+
+    if len(positional) < 1:
+        print("Usage: python main.py <image_path> [api_key] [options]")
+        print("       python main.py batch <dir|list.txt|image>... [options]")
+        print("\nOptions:")
+        print("  --cache PATH       SQLite result cache (default: tp2/.cache/results.sqlite)")
+        print("  --cache-ttl DAYS   lifetime of cached results (default: 30)")
+        print("  --cache-size MB    size limit of the cache, least recently used evicted (default: 64)")
+        print("  --no-cache         always call the API")
+        print("  --fake             local fake client instead of Gemini (no API key, no billing)")
         print("\nExample:")
         print("  python main.py image.png")
         print("  python main.py image.png YOUR_API_KEY")
         print("\nNote: API key will be loaded from .env file (GEMINI_API_KEY)")
         sys.exit(1)
     
-    image_path = sys.argv[1]
-    api_key = sys.argv[2] if len(sys.argv) > 2 else None
+    image_path = positional[0]
+    api_key = positional[1] if len(positional) > 1 else None
     
     try:
         print(f"Analyzing image: {image_path}")
         print("Looking for Roman numerals...\n")
+
+        client = None
+        if fake:
+            from fake_client import FakeClient
+            client = FakeClient(latency=0.3)
+        cache = None
+        if cache_path:
+            cache = ResultCache(cache_path, ttl=ttl_days * 24 * 3600, max_bytes=int(cache_mb * 1024 * 1024))
         
-        result = find_roman_numeral(image_path, api_key)
+        result = find_roman_numeral(image_path, api_key, client=client, cache=cache)
         
         print("=" * 50)
-        print("RESULT:")
+        print("RESULT:" + (" (cache)" if cache is not None and cache.hits else ""))
         print("=" * 50)
         print(result)
         print("=" * 50)
@@ -110,4 +199,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
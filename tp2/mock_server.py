@@ -0,0 +1,142 @@
+import sys
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class MockState:
+    """Counters and rate limit shared by the request handlers"""
+
+    def __init__(self, latency_ms=300.0, jitter_ms=100.0, rate=None, error_rate=0.0, answer="IV", seed=None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.rate = rate
+        self.error_rate = error_rate
+        self.answer = answer
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.stats = {'requests': 0, 'ok': 0, 'rate_limited': 0, 'errors': 0,
+                      'in_flight': 0, 'max_in_flight': 0}
+
+    def admit(self):
+        """HTTP status of the next request: 200, 429 (over `rate` per second) or 503 (random failure)"""
+        with self.lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+            if self.rate is not None and self.window_count >= self.rate:
+                self.stats['rate_limited'] += 1
+                return 429
+            self.window_count += 1
+            if self.random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return 503
+            self.stats['in_flight'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+            return 200
+
+    def delay(self):
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def done(self):
+        with self.lock:
+            self.stats['in_flight'] -= 1
+            self.stats['ok'] += 1
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != '/generate':
+                self._send(404, {'error': 'not found'})
+                return
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            status = state.admit()
+            if status == 429:
+                self._send(429, {'error': 'rate limit exceeded'}, {'Retry-After': '1'})
+                return
+            if status == 503:
+                self._send(503, {'error': 'service unavailable'})
+                return
+            time.sleep(state.delay())
+            state.done()
+            self._send(200, {'text': state.answer})
+
+        def do_GET(self):
+            if self.path == '/stats':
+                with state.lock:
+                    self._send(200, dict(state.stats))
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8080, host='127.0.0.1', **kwargs):
+    """Start the mock server in a background thread, returns the server (server.shutdown() to stop)"""
+    state = MockState(**kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(args):
+    """
+    Local stand-in for the Gemini API: simulated latency, rate limit (429) and
+    random failures (503). Used with: python main.py batch <dir> --mock http://127.0.0.1:8080
+    """
+    options = {}
+    port = 8080
+    i = 0
+    while i < len(args):
+        if args[i] == '--port' and i + 1 < len(args):
+            port = int(args[i + 1])
+        elif args[i] == '--latency' and i + 1 < len(args):
+            options['latency_ms'] = float(args[i + 1])
+        elif args[i] == '--jitter' and i + 1 < len(args):
+            options['jitter_ms'] = float(args[i + 1])
+        elif args[i] == '--rate' and i + 1 < len(args):
+            options['rate'] = float(args[i + 1])
+        elif args[i] == '--error-rate' and i + 1 < len(args):
+            options['error_rate'] = float(args[i + 1])
+        elif args[i] == '--answer' and i + 1 < len(args):
+            options['answer'] = args[i + 1]
+        else:
+            print("Usage: python mock_server.py [--port 8080] [--latency MS] [--jitter MS] "
+                  "[--rate REQ_PER_S] [--error-rate P] [--answer TEXT]")
+            return 1
+        i += 2
+
+    server = serve(port, **options)
+    print(f"mock Gemini server on http://127.0.0.1:{port} (stats: GET /stats)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
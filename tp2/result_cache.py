@@ -0,0 +1,100 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class ResultCache:
+    """
+    Persistent cache of model answers, keyed on the image content, the prompt and the model name.
+
+    Stored in SQLite so it survives between runs and can be shared by several
+    processes. Entries older than `ttl` seconds are ignored and deleted; when
+    the stored answers exceed `max_bytes`, the least recently used ones are
+    evicted. One connection is shared by all threads of a process.
+    """
+
+    def __init__(self, path, ttl=30 * 24 * 3600, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite database file (created if needed)
+            ttl: Lifetime of an entry in seconds (None: never expires)
+            max_bytes: Size limit of the stored keys and answers
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, model TEXT, result TEXT, size INTEGER, "
+            "created REAL, accessed REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    @staticmethod
+    def key(image_bytes, prompt, model_name):
+        """Hash of the image content, the prompt and the model name"""
+        h = hashlib.sha256(image_bytes)
+        h.update(b'\0' + prompt.encode('utf-8') + b'\0' + model_name.encode('utf-8'))
+        return h.hexdigest()
+
+    def get(self, key):
+        """Cached answer for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT result, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model_name, result):
+        """Store an answer, then evict the least recently used entries above max_bytes"""
+        now = time.time()
+        size = len(key) + len(result.encode('utf-8'))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                                 (key, model_name, result, size, now, now))
+                if self.ttl is not None:
+                    self._db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+                self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # walk the entries from the least recently used until enough space is freed
+        to_delete = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", to_delete)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
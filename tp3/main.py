@@ -3,9 +3,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import sys
 import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 
-def contourDetection(img):
+def contourDetection(img, display=True):
     
     # Conversion to grayscale 
     if len(img.shape) == 3:
@@ -18,7 +21,8 @@ def contourDetection(img):
     
     # Find Canny edges 
     edged = cv2.Canny(blur, 30, 200) 
-    cv2.imshow('Canny', edged) 
+    if display:
+        cv2.imshow('Canny', edged) 
 
     # Finding Contours 
     contours, hierarchy = cv2.findContours(edged, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE) 
@@ -32,13 +36,323 @@ def contourDetection(img):
     # Draw all contours (i.e -1)
     cv2.drawContours(img_with_contours, contours, -1, (0, 255, 0), 3) 
     
-    cv2.namedWindow('Contours', cv2.WINDOW_NORMAL)  
-    cv2.imshow('Contours', img_with_contours)
+    if display:
+        cv2.namedWindow('Contours', cv2.WINDOW_NORMAL)  
+        cv2.imshow('Contours', img_with_contours)
     
     return img_with_contours, edged
 
+
+class ContourStream:
+    """
+    Contour detection on a stream of frames with preallocated buffers.
+
+    The gray -> GaussianBlur -> Canny -> findContours chain writes into buffers
+    allocated for the first frame and reused for all following frames of the
+    same size, and nothing is displayed.
+    """
+
+    def __init__(self, shape, width=None):
+        h, w = shape[:2]
+        if width is not None and width != w:
+            self.size = (int(width), int(h * width / w))
+        else:
+            self.size = (w, h)
+        out_w, out_h = self.size
+        self.resized = np.empty((out_h, out_w, 3), dtype=np.uint8)
+        self.gray = np.empty((out_h, out_w), dtype=np.uint8)
+        self.blur = np.empty((out_h, out_w), dtype=np.uint8)
+        self.edged = np.empty((out_h, out_w), dtype=np.uint8)
+        self.overlay = np.empty((out_h, out_w, 3), dtype=np.uint8)
+
+    def contours(self, frame, mode=cv2.RETR_TREE):
+        """Run the chain without drawing; returns (frame, contours, hierarchy) at the stream size"""
+        if len(frame.shape) == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, dst=self.resized)
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        cv2.GaussianBlur(self.gray, (5, 5), 0, dst=self.blur)
+        cv2.Canny(self.blur, 30, 200, edges=self.edged)
+        contours, hierarchy = cv2.findContours(self.edged, mode, cv2.CHAIN_APPROX_SIMPLE)
+        return frame, contours, hierarchy
+
+    def process(self, frame):
+        frame, contours, _ = self.contours(frame)
+
+        np.copyto(self.overlay, frame)
+        cv2.drawContours(self.overlay, contours, -1, (0, 255, 0), 3)
+        return self.overlay, self.edged, contours
+
+
+def read_frames(source):
+    """Yield frames from a video file, camera index, printf pattern (img_%04d.png), glob or directory"""
+    if os.path.isdir(source) or any(c in source for c in '*?['):
+        pattern = os.path.join(source, '*') if os.path.isdir(source) else source
+        for path in sorted(glob.glob(pattern)):
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is not None:
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    if not cap.isOpened():
+        raise ValueError(f"Impossible d'ouvrir la source vidéo '{source}'")
+    try:
+        ok, frame = cap.read()
+        while ok:
+            yield frame
+            # decode the next frame into the same buffer
+            ok, frame = cap.read(frame)
+    finally:
+        cap.release()
+
+
+def process_video(source, output_path=None, width=None, fps=25.0, max_frames=None):
+    """
+    Run contour detection on every frame of a video or image sequence, headless.
+
+    Contour overlays are written to output_path with a cv2.VideoWriter.
+    Returns (frames, fps) where fps is the sustained end-to-end rate
+    (decode + processing + encode).
+    """
+    stream = None
+    writer = None
+    frames = 0
+    processing = 0.0
+    start = time.perf_counter()
+    try:
+        for frame in read_frames(source):
+            if stream is None:
+                stream = ContourStream(frame.shape, width)
+                if output_path is not None:
+                    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                    writer = cv2.VideoWriter(output_path, fourcc, fps, stream.size)
+                    if not writer.isOpened():
+                        writer = None
+                        raise ValueError(f"Impossible d'écrire la vidéo '{output_path}' (codec mp4v ou dossier indisponible)")
+
+            t = time.perf_counter()
+            overlay, _, contours = stream.process(frame)
+            processing += time.perf_counter() - t
+
+            if writer is not None:
+                writer.write(overlay)
+            frames += 1
+            if frames % 100 == 0:
+                print(f"{frames} images, {frames / (time.perf_counter() - start):.1f} images/s")
+            if max_frames is not None and frames >= max_frames:
+                break
+    finally:
+        if writer is not None:
+            writer.release()
+
+    elapsed = time.perf_counter() - start
+    sustained = frames / elapsed if elapsed > 0 else 0.0
+    print(f"{frames} images traitées en {elapsed:.2f} s : {sustained:.1f} images/s "
+          f"({frames / processing if processing > 0 else 0.0:.1f} images/s hors décodage/encodage)")
+    return frames, sustained
+
+
+def video_main(args):
+    if not args:
+        print("Usage: python main.py video <source> [sortie.mp4] [--width <px>] [--fps <n>] [--max-frames <n>]")
+        print("  <source> : fichier vidéo, index de caméra, motif (img_%04d.png), glob ou dossier d'images")
+        return 1
+
+    source = args[0]
+    output_path = None
+    width = None
+    fps = 25.0
+    max_frames = None
+
+    i = 1
+    while i < len(args):
+        if args[i] == '--width' and i + 1 < len(args):
+            width = int(args[i + 1])
+            i += 2
+        elif args[i] == '--fps' and i + 1 < len(args):
+            fps = float(args[i + 1])
+            i += 2
+        elif args[i] == '--max-frames' and i + 1 < len(args):
+            max_frames = int(args[i + 1])
+            i += 2
+        elif not args[i].startswith('--'):
+            output_path = args[i]
+            i += 1
+        else:
+            i += 1
+
+    try:
+        process_video(source, output_path, width, fps, max_frames)
+    except ValueError as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+    if output_path is not None:
+        print(f"Vidéo avec contours sauvegardée: {output_path}")
+    return 0
+
+
+def contour_table(contours, hierarchy):
+    """
+    Pack OpenCV contours into flat NumPy columns.
+
+    Points of all contours are concatenated (contour i is
+    points[offsets[i]:offsets[i + 1]]); area, perimeter and bounding box are
+    computed for all contours at once with segment reductions, and match
+    cv2.contourArea, cv2.arcLength(closed=True) and cv2.boundingRect.
+    """
+    n = len(contours)
+    lengths = np.array([len(c) for c in contours], dtype=np.int64)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    points = (np.concatenate(contours).reshape(-1, 2) if n else np.empty((0, 2), np.int32)).astype(np.int32)
+    if hierarchy is None:
+        hierarchy = np.empty((0, 4), dtype=np.int32)
+
+    table = {
+        'points': points,
+        'offsets': offsets,
+        'hierarchy': hierarchy.reshape(-1, 4).astype(np.int32),
+        'area': np.zeros(n, dtype=np.float32),
+        'perimeter': np.zeros(n, dtype=np.float32),
+        'bbox': np.zeros((n, 4), dtype=np.int32),
+    }
+    if n == 0:
+        return table
+
+    # index of the next point of each point, wrapping around inside each contour
+    nxt = np.arange(1, len(points) + 1)
+    nxt[offsets[1:] - 1] = offsets[:-1]
+    x, y = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    starts = offsets[:-1]
+
+    cross = x * y[nxt] - x[nxt] * y
+    table['area'] = (np.abs(np.add.reduceat(cross, starts)) / 2).astype(np.float32)
+    table['perimeter'] = np.add.reduceat(np.hypot(x[nxt] - x, y[nxt] - y), starts).astype(np.float32)
+    x0 = np.minimum.reduceat(points[:, 0], starts)
+    y0 = np.minimum.reduceat(points[:, 1], starts)
+    x1 = np.maximum.reduceat(points[:, 0], starts)
+    y1 = np.maximum.reduceat(points[:, 1], starts)
+    table['bbox'] = np.stack([x0, y0, x1 - x0 + 1, y1 - y0 + 1], axis=1).astype(np.int32)
+    return table
+
+
+def extract_contours(image_path, output_dir, width=512, overlay=False, name=None):
+    """
+    Headless contour extraction for one image, saved as {name}.npz in output_dir.
+
+    name defaults to the file name with its extension (a.jpg and a.png do not
+    collide); it may contain subdirectories, created in output_dir.
+    Returns (image_path, number of contours), or (image_path, None) if the
+    image could not be read.
+    """
+    img = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if img is None:
+        return image_path, None
+
+    if width is not None:
+        h, w = img.shape[:2]
+        # at least one row for very wide images
+        img = cv2.resize(img, (int(width), max(1, int(h * width / w))))
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    blur = cv2.GaussianBlur(gray, (5, 5), 0)
+    edged = cv2.Canny(blur, 30, 200)
+    contours, hierarchy = cv2.findContours(edged, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+
+    if name is None:
+        name = os.path.basename(image_path)
+    output_base = os.path.join(output_dir, name)
+    os.makedirs(os.path.dirname(output_base), exist_ok=True)
+    table = contour_table(contours, hierarchy)
+    np.savez_compressed(f"{output_base}.npz",
+                        image_size=np.array(img.shape[:2], dtype=np.int32), **table)
+
+    if overlay:
+        cv2.drawContours(img, contours, -1, (0, 255, 0), 3)
+        cv2.imwrite(f"{output_base}_contours.png", img)
+    return image_path, len(contours)
+
+
+def _extract_contours_job(job):
+    """Pool worker: errors are returned per image instead of failing the whole batch"""
+    try:
+        image_path, n_contours = extract_contours(*job)
+    except Exception as e:
+        return job[0], None, f"{type(e).__name__}: {e}"
+    if n_contours is None:
+        return image_path, None, "Impossible de charger l'image"
+    return image_path, n_contours, None
+
+
+def batch_contours(source, output_dir, width=512, workers=None, overlay=False):
+    """
+    Extract contours of every image of a directory or glob with a process pool.
+
+    Returns (number of images processed, images per second).
+    """
+    pattern = os.path.join(source, '*') if os.path.isdir(source) else source
+    paths = sorted(p for p in glob.glob(pattern) if os.path.isfile(p))
+    os.makedirs(output_dir, exist_ok=True)
+
+    # output names relative to the common directory: a glob over several
+    # directories keeps one file per image (d1/a.png -> d1/a.png.npz)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else ''
+    jobs = [(path, output_dir, width, overlay, os.path.relpath(os.path.abspath(path), root)) for path in paths]
+    done = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        for image_path, n_contours, error in pool.map(_extract_contours_job, jobs, chunksize=chunksize):
+            if error is not None:
+                print(f"Erreur: {image_path}: {error}", file=sys.stderr)
+                continue
+            done += 1
+
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"{done} images traitées en {elapsed:.2f} s : {rate:.1f} images/s")
+    return done, rate
+
+
+def batch_main(args):
+    if len(args) < 2:
+        print("Usage: python main.py batch <dossier|motif_glob> <dossier_sortie> [--width <px>] [--workers <n>] [--overlay]")
+        print("  Écrit pour chaque image un fichier {nom}.{ext}.npz : points, offsets, hierarchy, area, perimeter, bbox")
+        return 1
+
+    source, output_dir = args[0], args[1]
+    width = 512
+    workers = None
+    overlay = False
+
+    i = 2
+    while i < len(args):
+        if args[i] == '--width' and i + 1 < len(args):
+            width = None if args[i + 1] == 'none' else int(args[i + 1])
+            i += 2
+        elif args[i] == '--workers' and i + 1 < len(args):
+            workers = int(args[i + 1])
+            i += 2
+        elif args[i] == '--overlay':
+            overlay = True
+            i += 1
+        else:
+            i += 1
+
+    batch_contours(source, output_dir, width, workers, overlay)
+    return 0
+
+
 def main(args):
     
+    if args and args[0] == 'video':
+        return video_main(args[1:])
+    if args and args[0] == 'batch':
+        return batch_main(args[1:])
+    
     ## Open and resize image
     # Get the directory where the script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
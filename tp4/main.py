@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 
 def convert_to_black_white(image_path, output_path=None):
@@ -72,51 +74,271 @@ def load_colorization_model(model_dir="./models"):
     return net, pts
 
 
-def colorize_with_cnn(image_path, model_dir="./models", output_path=None, display=False):
+# Octets de mémoire de travail par pixel d'une bande (pic mesuré avec tracemalloc) :
+# tampons BGR et LAB float32 (12 + 12), canaux ab interpolés (8), conversion
+# en BGR d'une bande en niveaux de gris ou copie des lignes d'un memmap (3 + 3)
+_BYTES_PER_PIXEL = 40
+
+
+def _linear_coords(dst_size, src_size):
     """
-    Colorise une image en N&B en utilisant un modèle CNN pré-entraîné.
+    Indices et poids de l'interpolation linéaire de cv2.resize le long d'un axe.
     
     Args:
-        image_path: Chemin vers l'image en N&B
-        model_dir: Répertoire contenant les fichiers du modèle
-        output_path: Chemin de sortie (optionnel)
-        display: Si True, affiche les images (originale et colorisée)
+        dst_size: Taille de sortie
+        src_size: Taille d'entrée
     
     Returns:
-        Chemin de l'image colorisée
+        Tuple (i0, i1, w) - sortie[k] = entrée[i0[k]] * (1 - w[k]) + entrée[i1[k]] * w[k]
     """
-    # Charger le modèle
-    net, _ = load_colorization_model(model_dir)
+    scale = 1.0 / (dst_size / src_size)
+    f = (np.arange(dst_size) + 0.5) * scale - 0.5
+    i0 = np.floor(f).astype(np.int64)
+    w = (f - i0).astype(np.float32)
+    w[i0 < 0] = 0
+    i0[i0 < 0] = 0
+    last = i0 >= src_size - 1
+    w[last] = 0
+    i0[last] = src_size - 1
+    i1 = np.minimum(i0 + 1, src_size - 1)
+    return i0, i1, w
+
+
+def _to_bgr(image):
+    """Convertit une image (ou une bande) en niveaux de gris en BGR, comme cv2.imread."""
+    if image.ndim == 2:
+        return cv2.cvtColor(np.ascontiguousarray(image), cv2.COLOR_GRAY2BGR)
+    return image
+
+
+def _lab_from_bgr(image, scaled=None, out=None):
+    """
+    Convertit une image BGR uint8 en LAB float32.
     
-    # Charger et prétraiter l'image
-    image = cv2.imread(image_path)
-    if image is None:
-        raise ValueError(f"Impossible de charger l'image: {image_path}")
+    Args:
+        image: Image BGR (H x W x 3) ou en niveaux de gris (H x W), uint8
+        scaled: Tampon H x W x 3 float32 pour l'image normalisée (optionnel)
+        out: Tampon H x W x 3 float32 pour le résultat (optionnel)
     
-    # Normaliser l'image
-    scaled = image.astype("float32") / 255.0
-    lab = cv2.cvtColor(scaled, cv2.COLOR_BGR2LAB)
+    Returns:
+        Image LAB float32 (out s'il est fourni)
+    """
+    scaled = np.divide(_to_bgr(image), np.float32(255.0), out=scaled, dtype=np.float32)
+    return cv2.cvtColor(scaled, cv2.COLOR_BGR2LAB, dst=out)
+
+
+class Colorizer:
+    """
+    Modèle de colorisation chargé une seule fois et réutilisé pour plusieurs images.
     
-    # Redimensionner pour le réseau
-    resized = cv2.resize(lab, (224, 224))
-    L = cv2.split(resized)[0]
-    L -= 50
+    Args:
+        model_dir: Répertoire contenant les fichiers du modèle
+    """
     
-    # Effectuer la colorisation
-    print("Colorisation de l'image...")
-    net.setInput(cv2.dnn.blobFromImage(L))
-    ab = net.forward()[0, :, :, :].transpose((1, 2, 0))
+    def __init__(self, model_dir="./models"):
+        self.net, self.pts = load_colorization_model(model_dir)
+    
+    @staticmethod
+    def prepare(image):
+        """
+        Prétraite une image pour le réseau.
+        
+        Args:
+            image: Image BGR uint8
+        
+        Returns:
+            Tuple (lab, L) - L'image en LAB (float32) et le canal L 224x224 centré
+        """
+        # Normaliser l'image
+        scaled = image.astype("float32") / 255.0
+        lab = cv2.cvtColor(scaled, cv2.COLOR_BGR2LAB)
+        
+        # Redimensionner pour le réseau
+        resized = cv2.resize(lab, (224, 224))
+        L = cv2.split(resized)[0]
+        L -= 50
+        return lab, L
     
-    # Redimensionner les canaux a et b à la taille originale
-    ab = cv2.resize(ab, (image.shape[1], image.shape[0]))
+    @staticmethod
+    def merge(lab, ab):
+        """
+        Combine le canal L de l'image originale avec les canaux ab prédits.
+        
+        Args:
+            lab: Image originale en LAB (float32)
+            ab: Canaux a et b prédits par le réseau (H x W x 2)
+        
+        Returns:
+            Image colorisée (BGR uint8)
+        """
+        # Redimensionner les canaux a et b à la taille originale
+        ab = cv2.resize(ab, (lab.shape[1], lab.shape[0]))
+        
+        # Combiner les canaux et convertir en BGR
+        L = cv2.split(lab)[0]
+        colorized = np.concatenate((L[:, :, np.newaxis], ab), axis=2)
+        
+        colorized = cv2.cvtColor(colorized, cv2.COLOR_LAB2BGR)
+        colorized = np.clip(colorized, 0, 1)
+        colorized = (255 * colorized).astype("uint8")
+        
+        return colorized
     
-    # Combiner les canaux et convertir en BGR
-    L = cv2.split(lab)[0]
-    colorized = np.concatenate((L[:, :, np.newaxis], ab), axis=2)
+    def predict_ab(self, L_channels):
+        """
+        Prédit les canaux ab pour plusieurs canaux L 224x224 en une seule passe avant.
+        
+        Args:
+            L_channels: Liste de canaux L prétraités (voir prepare)
+        
+        Returns:
+            Liste de canaux ab (H x W x 2), un par image
+        """
+        self.net.setInput(cv2.dnn.blobFromImages(L_channels))
+        ab = self.net.forward()
+        return [ab[i].transpose((1, 2, 0)) for i in range(len(L_channels))]
     
-    colorized = cv2.cvtColor(colorized, cv2.COLOR_LAB2BGR)
-    colorized = np.clip(colorized, 0, 1)
-    colorized = (255 * colorized).astype("uint8")
+    def colorize(self, image):
+        """
+        Colorise une image (BGR uint8) avec le réseau déjà chargé.
+        
+        Args:
+            image: Image BGR à coloriser
+        
+        Returns:
+            Image colorisée (BGR uint8)
+        """
+        lab, L = self.prepare(image)
+        ab = self.predict_ab([L])[0]
+        return self.merge(lab, ab)
+    
+    def colorize_tiled(self, image, max_memory_mb=256, out=None):
+        """
+        Colorise une image par bandes horizontales avec une mémoire de travail bornée.
+        
+        Contrairement à colorize, aucune copie float32 de l'image entière n'est créée :
+        l'entrée du réseau est calculée à partir des seules lignes nécessaires au
+        redimensionnement 224x224, puis les canaux ab sont agrandis et recombinés bande
+        par bande. Le résultat est identique à colorize (aux arrondis flottants près).
+        L'image peut être un tableau memory-mappé (np.load(..., mmap_mode='r')).
+        
+        Args:
+            image: Image BGR (H x W x 3) ou en niveaux de gris (H x W), uint8
+            max_memory_mb: Mémoire de travail maximale (hors entrée et sortie) en Mo
+            out: Tableau de sortie H x W x 3 uint8 (optionnel, peut être memory-mappé)
+        
+        Returns:
+            Image colorisée (BGR uint8)
+        """
+        height, width = image.shape[:2]
+        if out is None:
+            out = np.empty((height, width, 3), dtype=np.uint8)
+        budget = int(max_memory_mb * 1024 * 1024)
+        
+        # Canal L 224x224 du réseau : seules les lignes utilisées par l'interpolation
+        # linéaire (2 par ligne de sortie) sont converties en LAB
+        y0, y1, wy = _linear_coords(224, height)
+        x0, x1, wx = _linear_coords(224, width)
+        needed = np.unique(np.concatenate([y0, y1]))
+        L_rows = np.empty((len(needed), 224), dtype=np.float32)
+        rows = min(len(needed), max(1, budget // (width * _BYTES_PER_PIXEL)))
+        scaled = np.empty((rows, width, 3), dtype=np.float32)
+        lab = np.empty((rows, width, 3), dtype=np.float32)
+        for start in range(0, len(needed), rows):
+            chunk = needed[start:start + rows]
+            n = len(chunk)
+            L = _lab_from_bgr(image[chunk], scaled[:n], lab[:n])[:, :, 0]
+            L_rows[start:start + n] = L[:, x0] * (1 - wx) + L[:, x1] * wx
+        del scaled, lab
+        r0 = np.searchsorted(needed, y0)
+        r1 = np.searchsorted(needed, y1)
+        L = L_rows[r0] * (1 - wy)[:, None] + L_rows[r1] * wy[:, None]
+        L -= 50
+        
+        ab = self.predict_ab([L])[0]
+        
+        # Agrandissement horizontal des canaux ab (petit), puis vertical par bande.
+        # Les canaux ab agrandis (hauteur du réseau x W x 2 float32) font partie de
+        # la mémoire de travail : les bandes se partagent le reste du budget.
+        ab = cv2.resize(ab, (width, ab.shape[0]))
+        a0, a1, wa = _linear_coords(height, ab.shape[0])
+        rows = min(height, max(1, (budget - ab.nbytes) // (width * _BYTES_PER_PIXEL)))
+        
+        # Tampons réutilisés par toutes les bandes, conversions sur place
+        scaled = np.empty((rows, width, 3), dtype=np.float32)
+        lab = np.empty((rows, width, 3), dtype=np.float32)
+        ab_strip = np.empty((rows, width, 2), dtype=np.float32)
+        for start in range(0, height, rows):
+            stop = min(start + rows, height)
+            n = stop - start
+            w = wa[start:stop, None, None]
+            
+            # Canal L de la bande et canaux ab interpolés dans le même tableau LAB
+            # (mode='clip' : np.take écrit directement dans out, sans tampon intermédiaire)
+            _lab_from_bgr(image[start:stop], scaled[:n], lab[:n])
+            np.take(ab, a0[start:stop], axis=0, out=ab_strip[:n], mode='clip')
+            ab_strip[:n] *= 1 - w
+            lab[:n, :, 1:] = ab_strip[:n]
+            np.take(ab, a1[start:stop], axis=0, out=ab_strip[:n], mode='clip')
+            ab_strip[:n] *= w
+            lab[:n, :, 1:] += ab_strip[:n]
+            
+            colorized = cv2.cvtColor(lab[:n], cv2.COLOR_LAB2BGR, dst=scaled[:n])
+            np.clip(colorized, 0, 1, out=colorized)
+            colorized *= 255
+            out[start:stop] = colorized
+        
+        return out
+
+
+# Modèles déjà chargés, par répertoire de modèle
+_colorizers = {}
+
+
+def get_colorizer(model_dir="./models"):
+    """
+    Retourne le Colorizer associé à model_dir, en ne chargeant le modèle qu'au premier appel.
+    
+    Args:
+        model_dir: Répertoire contenant les fichiers du modèle
+    
+    Returns:
+        Instance de Colorizer
+    """
+    key = os.path.abspath(model_dir)
+    if key not in _colorizers:
+        _colorizers[key] = Colorizer(model_dir)
+    return _colorizers[key]
+
+
+def colorize_with_cnn(image_path, model_dir="./models", output_path=None, display=False,
+                      max_memory_mb=None):
+    """
+    Colorise une image en N&B en utilisant un modèle CNN pré-entraîné.
+    
+    Le modèle est chargé une seule fois par répertoire puis réutilisé (voir get_colorizer).
+    
+    Args:
+        image_path: Chemin vers l'image en N&B (ou tableau .npy, lu en memory-map)
+        model_dir: Répertoire contenant les fichiers du modèle
+        output_path: Chemin de sortie (optionnel, .npy pour écrire dans un tableau memory-mappé)
+        display: Si True, affiche les images (originale et colorisée)
+        max_memory_mb: Si fourni, colorise par bandes avec cette mémoire de travail
+            maximale (en Mo), pour les images très grandes (voir Colorizer.colorize_tiled)
+    
+    Returns:
+        Chemin de l'image colorisée
+    """
+    # Charger le modèle (une seule fois)
+    colorizer = get_colorizer(model_dir)
+    
+    # Charger l'image
+    if image_path.endswith('.npy'):
+        image = np.load(image_path, mmap_mode='r')
+    else:
+        image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"Impossible de charger l'image: {image_path}")
     
     # Générer le chemin de sortie
     if output_path is None:
@@ -124,8 +346,25 @@ def colorize_with_cnn(image_path, model_dir="./models", output_path=None, displa
         extension = os.path.splitext(image_path)[1]
         output_path = f"{base_name}_colorized{extension}"
     
+    # Effectuer la colorisation
+    print("Colorisation de l'image...")
+    if max_memory_mb is None and image.ndim == 3:
+        colorized = colorizer.colorize(np.asarray(image))
+    else:
+        out = None
+        if output_path.endswith('.npy'):
+            out = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.uint8,
+                                            shape=image.shape[:2] + (3,))
+        colorized = colorizer.colorize_tiled(image, max_memory_mb or 256, out)
+    
     # Sauvegarder
-    cv2.imwrite(output_path, colorized)
+    if output_path.endswith('.npy'):
+        if isinstance(colorized, np.memmap):
+            colorized.flush()
+        else:
+            np.save(output_path, colorized)
+    else:
+        cv2.imwrite(output_path, colorized)
     
     # Afficher si demandé
     if display:
@@ -138,6 +377,159 @@ def colorize_with_cnn(image_path, model_dir="./models", output_path=None, displa
     return output_path
 
 
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff')
+
+
+def list_images(input_dir, output_dir=None, suffix=""):
+    """
+    Parcourt une arborescence et associe chaque image à son chemin de sortie.
+    
+    Args:
+        input_dir: Répertoire à parcourir (récursivement)
+        output_dir: Répertoire de sortie (optionnel, sinon à côté de l'image d'origine)
+        suffix: Suffixe ajouté au nom des fichiers de sortie (ex: "_colorized")
+    
+    Returns:
+        Liste de tuples (chemin_entrée, chemin_sortie)
+    """
+    pairs = []
+    # Ne pas parcourir le répertoire de sortie s'il est à l'intérieur du répertoire d'entrée
+    skip_dir = os.path.realpath(output_dir) if output_dir is not None else None
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.realpath(os.path.join(root, d)) != skip_dir)
+        if os.path.realpath(root) == skip_dir:
+            continue
+        for name in sorted(files):
+            base_name, extension = os.path.splitext(name)
+            if extension.lower() not in IMAGE_EXTENSIONS:
+                continue
+            # Ne pas retraiter les résultats d'un passage précédent
+            if suffix and output_dir is None and base_name.endswith(suffix):
+                continue
+            out_root = root if output_dir is None else os.path.join(output_dir, os.path.relpath(root, input_dir))
+            pairs.append((os.path.join(root, name), os.path.join(out_root, f"{base_name}{suffix}{extension}")))
+    return pairs
+
+
+def _write_image(path, image):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if not cv2.imwrite(path, image):
+        raise ValueError(f"Impossible d'écrire l'image: {path}")
+    return path
+
+
+def _collect(future, saved):
+    try:
+        saved.append(future.result())
+    except Exception as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+
+
+def convert_directory(input_dir, output_dir=None, workers=8, skip_existing=True):
+    """
+    Convertit en noir et blanc toutes les images d'une arborescence.
+    
+    Args:
+        input_dir: Répertoire contenant les images
+        output_dir: Répertoire de sortie (optionnel, sinon "{nom}_bw.{ext}" à côté de l'original)
+        workers: Nombre de threads pour la lecture, la conversion et l'écriture
+        skip_existing: Si True, ignore les images dont la sortie existe déjà
+    
+    Returns:
+        Liste des chemins des images sauvegardées
+    """
+    suffix = "_bw" if output_dir is None else ""
+    pairs = list_images(input_dir, output_dir, suffix)
+    if skip_existing:
+        pairs = [(src, dst) for src, dst in pairs if not os.path.exists(dst)]
+    
+    def convert(pair):
+        src, dst = pair
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        return convert_to_black_white(src, dst)
+    
+    saved = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Une image illisible est signalée sans interrompre le reste du répertoire
+        for future in [pool.submit(convert, pair) for pair in pairs]:
+            _collect(future, saved)
+    return saved
+
+
+def colorize_directory(input_dir, output_dir=None, model_dir="./models", batch_size=16,
+                       workers=8, skip_existing=True):
+    """
+    Colorise toutes les images N&B d'une arborescence.
+    
+    Les canaux L 224x224 sont empilés dans un seul blob (cv2.dnn.blobFromImages) pour
+    une passe avant par lot. La lecture et le prétraitement du lot suivant ainsi que
+    la reconstruction et l'écriture des résultats se font dans un pool de threads,
+    en parallèle de l'inférence.
+    
+    Args:
+        input_dir: Répertoire contenant les images N&B
+        output_dir: Répertoire de sortie (optionnel, sinon "{nom}_colorized.{ext}" à côté de l'original)
+        model_dir: Répertoire contenant les fichiers du modèle
+        batch_size: Nombre d'images par passe avant
+        workers: Nombre de threads pour la lecture, le prétraitement et l'écriture
+        skip_existing: Si True, ignore les images dont la sortie existe déjà
+    
+    Returns:
+        Liste des chemins des images sauvegardées
+    """
+    suffix = "_colorized" if output_dir is None else ""
+    pairs = list_images(input_dir, output_dir, suffix)
+    if skip_existing:
+        pairs = [(src, dst) for src, dst in pairs if not os.path.exists(dst)]
+    if not pairs:
+        return []
+    
+    colorizer = get_colorizer(model_dir)
+    
+    def load(src):
+        image = cv2.imread(src)
+        if image is None:
+            raise ValueError(f"Impossible de charger l'image: {src}")
+        return colorizer.prepare(image)
+    
+    def save(lab, ab, dst):
+        return _write_image(dst, colorizer.merge(lab, ab))
+    
+    batches = [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+    saved = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending_writes = []
+        next_batch = [pool.submit(load, src) for src, _ in batches[0]]
+        for b, batch in enumerate(batches):
+            prepared = []
+            for (src, dst), future in zip(batch, next_batch):
+                try:
+                    prepared.append((future.result(), dst))
+                except Exception as e:
+                    print(f"Erreur: {e}", file=sys.stderr)
+            
+            # Lancer la lecture du lot suivant pendant l'inférence
+            if b + 1 < len(batches):
+                next_batch = [pool.submit(load, src) for src, _ in batches[b + 1]]
+            
+            if prepared:
+                ab_list = colorizer.predict_ab([L for (_, L), _ in prepared])
+                for ((lab, _), dst), ab in zip(prepared, ab_list):
+                    pending_writes.append(pool.submit(save, lab, ab, dst))
+            
+            # Limiter le nombre d'images en attente d'écriture
+            while len(pending_writes) > 2 * batch_size:
+                _collect(pending_writes.pop(0), saved)
+        
+        for future in pending_writes:
+            _collect(future, saved)
+    
+    elapsed = time.perf_counter() - start
+    print(f"{len(saved)} images colorisées en {elapsed:.1f} s ({len(saved) / elapsed:.1f} images/s)")
+    return saved
+
+
 def main():
     """Fonction principale."""
     if len(sys.argv) < 3:
@@ -145,13 +537,22 @@ def main():
         print("\nModes:")
         print("  bw       - Convertir une image couleur en noir et blanc")
         print("  colorize - Coloriser une image N&B avec un modèle CNN pré-entraîné")
+        print("  bw-dir       - Convertir en noir et blanc toutes les images d'un répertoire")
+        print("  colorize-dir - Coloriser toutes les images d'un répertoire (par lots)")
         print("\nOptions pour 'colorize':")
         print("  --model-dir <dir>   - Répertoire contenant les fichiers du modèle (défaut: ./models)")
         print("  --display           - Afficher les images (originale et colorisée)")
+        print("  --max-memory <Mo>   - Coloriser par bandes avec une mémoire de travail bornée (grandes images)")
+        print("\nOptions pour 'bw-dir' et 'colorize-dir':")
+        print("  <dossier_sortie>    - Répertoire de sortie (optionnel, défaut: à côté des originaux)")
+        print("  --workers <n>       - Nombre de threads de lecture/écriture (défaut: 8)")
+        print("  --batch-size <n>    - Images par passe avant, colorize-dir uniquement (défaut: 16)")
+        print("  --overwrite         - Retraiter les images dont la sortie existe déjà")
         print("\nExemples:")
         print("  python main.py bw image.jpg")
         print("  python main.py colorize image_bw.jpg")
         print("  python main.py colorize image_bw.jpg --model-dir ./models --display")
+        print("  python main.py colorize-dir scans/ scans_colorized/ --batch-size 32")
         sys.exit(1)
     
     mode = sys.argv[1].lower()
@@ -180,6 +581,7 @@ def main():
         model_dir = "./models"
         output_path = None
         display = False
+        max_memory_mb = None
         
         # Parser les options
         i = 3
@@ -190,6 +592,9 @@ def main():
             elif sys.argv[i] == '--display':
                 display = True
                 i += 1
+            elif sys.argv[i] == '--max-memory' and i + 1 < len(sys.argv):
+                max_memory_mb = float(sys.argv[i + 1])
+                i += 2
             elif not sys.argv[i].startswith('--'):
                 output_path = sys.argv[i]
                 i += 1
@@ -197,15 +602,59 @@ def main():
                 i += 1
         
         try:
-            result_path = colorize_with_cnn(image_path, model_dir, output_path, display)
+            result_path = colorize_with_cnn(image_path, model_dir, output_path, display, max_memory_mb)
             print(f"Image colorisée sauvegardée: {result_path}")
         except Exception as e:
             print(f"Erreur: {e}", file=sys.stderr)
             sys.exit(1)
     
+    elif mode in ('bw-dir', 'colorize-dir'):
+        input_dir = sys.argv[2]
+        if not os.path.isdir(input_dir):
+            print(f"Erreur: répertoire introuvable: {input_dir}")
+            sys.exit(1)
+        
+        model_dir = "./models"
+        output_dir = None
+        batch_size = 16
+        workers = 8
+        skip_existing = True
+        
+        # Parser les options
+        i = 3
+        while i < len(sys.argv):
+            if sys.argv[i] == '--model-dir' and i + 1 < len(sys.argv):
+                model_dir = sys.argv[i + 1]
+                i += 2
+            elif sys.argv[i] == '--batch-size' and i + 1 < len(sys.argv):
+                batch_size = int(sys.argv[i + 1])
+                i += 2
+            elif sys.argv[i] == '--workers' and i + 1 < len(sys.argv):
+                workers = int(sys.argv[i + 1])
+                i += 2
+            elif sys.argv[i] == '--overwrite':
+                skip_existing = False
+                i += 1
+            elif not sys.argv[i].startswith('--'):
+                output_dir = sys.argv[i]
+                i += 1
+            else:
+                i += 1
+        
+        try:
+            if mode == 'bw-dir':
+                saved = convert_directory(input_dir, output_dir, workers, skip_existing)
+                print(f"{len(saved)} images converties en noir et blanc")
+            else:
+                colorize_directory(input_dir, output_dir, model_dir, batch_size, workers, skip_existing)
+        except Exception as e:
+            print(f"Erreur: {e}", file=sys.stderr)
+            sys.exit(1)
+    
     else:
         print(f"Mode invalide: {mode}")
-        print("Utilisez 'bw' pour convertir en noir et blanc ou 'colorize' pour coloriser")
+        print("Utilisez 'bw' pour convertir en noir et blanc, 'colorize' pour coloriser,")
+        print("ou 'bw-dir' / 'colorize-dir' pour traiter tout un répertoire")
         sys.exit(1)
 
 